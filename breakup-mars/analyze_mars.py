@@ -1,33 +1,273 @@
+import argparse
+import csv
+import heapq
+import itertools
 import os
-from pprint import pprint
+from operator import attrgetter
 
-os.chdir(os.path.dirname(__file__))
-inventory=[]
 try:
-    with open('Mars_Base_Inventory_List.csv', 'r', encoding='utf-8') as f:
-        mars_logs = f.readlines()
-
-except FileNotFoundError:
-    print("로그 파일이 존재하지 않습니다.")
-    exit(1)
-except PermissionError:
-    print("로그 파일에 접근 권한이 없습니다.")
-    exit(1)
-
-header = mars_logs[0].strip().split(',')
-
-for line in mars_logs[1:]:
-    values = line.strip().split(',')
-    if len(values) == len(header):
-        record = dict(zip(header, values))
-        inventory.append(record)
-
-inventory.sort(key=lambda x: float(x['Flammability']), reverse=True)
-
-flammable_items = [item for item in inventory if float(item['Flammability']) >= 0.7]
-for item in flammable_items:
-    print(item)
-with open('flammable_items.csv', 'w', encoding='utf-8') as f:
-    f.write(','.join(flammable_items[0].keys()) + '\n')
-    for item in flammable_items:
-        f.write(','.join(item.values()) + '\n')
\ No newline at end of file
+    import numpy as np
+except ImportError:
+    np = None
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+INVENTORY_FILE = 'Mars_Base_Inventory_List.csv'
+OUTPUT_FILE = 'flammable_items.csv'
+FLAMMABILITY_THRESHOLD = 0.7
+# 캐시를 읽을 때 한 번에 파이썬 값으로 바꾸는 행 수
+CACHE_BLOCK_ROWS = 64 * 1024
+
+
+def to_float(text):
+    '''숫자로 바꿀 수 없는 값('Various' 등)은 None으로 둡니다.'''
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+# (속성 이름, CSV 헤더 이름, 변환 함수)
+COLUMNS = (
+    ('substance', 'Substance', str),
+    ('weight', 'Weight (g/cm³)', to_float),
+    ('specific_gravity', 'Specific Gravity', to_float),
+    ('strength', 'Strength', str),
+    ('flammability', 'Flammability', to_float),
+)
+
+
+class InventoryItem:
+    '''
+    인벤토리 한 줄. 숫자 열은 읽을 때 한 번만 float로 바꿔 둡니다.
+    row에는 파일에 적힌 원래 값들을 그대로 남겨 다시 CSV로 쓸 때 사용합니다.
+    '''
+
+    __slots__ = tuple(name for name, _, _ in COLUMNS) + ('row',)
+
+    def __init__(self, row, positions):
+        self.row = row
+        for name, _, convert in COLUMNS:
+            setattr(self, name, convert(row[positions[name]]))
+
+    def as_dict(self, header):
+        return dict(zip(header, self.row))
+
+
+class InventoryReader:
+    '''
+    인벤토리 CSV를 한 줄씩 읽어 InventoryItem으로 내보냅니다. 파일 전체를 메모리에 올리지 않습니다.
+    따옴표로 감싼 쉼표도 csv 모듈이 올바르게 처리합니다.
+    header는 읽기를 시작한 뒤에 채워지고, 열 수가 맞지 않는 줄은 건너뛰고 skipped에 셉니다.
+    use_cache=True면 파싱한 값을 열 단위로 csv_cache(.npy)에 저장해 두고, 파일이 그대로면
+    다시 파싱하지 않고 메모리 매핑한 배열에서 바로 항목을 만듭니다. (NumPy가 필요합니다.)
+    '''
+
+    def __init__(self, path, use_cache=False):
+        self.path = path
+        self.use_cache = use_cache
+        self.header = None
+        self.skipped = 0
+
+    def _iter_rows(self):
+        with open(self.path, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.reader(f)
+            self.header = next(reader, [])
+            self._check_header()
+            width = len(self.header)
+            for row in reader:
+                if len(row) != width:
+                    if row:
+                        self.skipped += 1
+                    continue
+                yield row
+
+    def _check_header(self):
+        try:
+            self._positions = {name: self.header.index(column) for name, column, _ in COLUMNS}
+        except ValueError as e:
+            raise ValueError(f'인벤토리 파일에 필요한 열이 없습니다: {e}') from None
+
+    def _build_cache(self, path):
+        '''
+        파싱한 값을 열 단위로 저장합니다. 숫자 열은 float64(값이 없던 자리는 <열>_missing에 표시),
+        글자 열은 고유 값과 번호이고, 원래 줄은 CSV로 다시 써서 UTF-8 바이트 하나(lines)와 각 줄의 끝 위치(line_ends)로 둡니다.
+        '''
+        columns = {name: [] for name, _, _ in COLUMNS}
+        lines = _LineList()
+        writer = csv.writer(lines, lineterminator='')
+        for row in self._iter_rows():
+            item = InventoryItem(row, self._positions)
+            for name, values in columns.items():
+                values.append(getattr(item, name))
+            writer.writerow(row)
+        encoded = [line.encode('utf-8') for line in lines]
+        arrays = {
+            'header': self.header,
+            'skipped': [self.skipped],
+            'lines': np.frombuffer(b''.join(encoded), dtype=np.uint8),
+            'line_ends': np.cumsum([len(line) for line in encoded], dtype=np.int64),
+        }
+        for name, _, convert in COLUMNS:
+            values = columns[name]
+            if convert is to_float:
+                arrays[name + '_missing'] = np.array([value is None for value in values], dtype=bool)
+                arrays[name] = np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+            else:
+                # 글자 열은 같은 값이 되풀이되므로 고유 값 목록(<열>_values)과 번호로 저장합니다.
+                unique_values, codes = np.unique(np.array(values, dtype=str), return_inverse=True)
+                arrays[name + '_values'] = unique_values
+                arrays[name] = codes.ravel().astype(np.int32)
+        return arrays
+
+    def _cached_items(self):
+        '''
+        캐시를 메모리 매핑한 채 CACHE_BLOCK_ROWS행씩만 파이썬 값으로 바꿔 CachedInventoryItem을 내보냅니다.
+        float 변환도 CSV 파싱도 다시 하지 않고, 파일 전체를 메모리에 올리지도 않습니다.
+        '''
+        from csv_cache import cached_arrays
+        arrays = cached_arrays(self.path, 'analyze_mars', self._build_cache)
+        self.header = arrays['header'].tolist()
+        self.skipped = int(arrays['skipped'][0])
+        self._check_header()
+
+        lines, line_ends = arrays['lines'], arrays['line_ends']
+        for start in range(0, len(line_ends), CACHE_BLOCK_ROWS):
+            block = slice(start, start + CACHE_BLOCK_ROWS)
+            columns = []
+            for name, _, convert in COLUMNS:
+                values = arrays[name][block].tolist()
+                if convert is to_float:
+                    for position in np.flatnonzero(arrays[name + '_missing'][block]).tolist():
+                        values[position] = None
+                else:
+                    unique_values = arrays[name + '_values'].tolist()
+                    values = [unique_values[code] for code in values]
+                columns.append(values)
+            # 이 블록의 줄들만 한 번에 복사해 두고 항목마다 잘라 씁니다.
+            first = int(line_ends[start - 1]) if start else 0
+            ends = (line_ends[block] - first).tolist()
+            text = lines[first:first + ends[-1]].tobytes()
+            starts = [0] + ends[:-1]
+            for line_start, line_end, values in zip(starts, ends, zip(*columns)):
+                yield CachedInventoryItem(text[line_start:line_end], values)
+
+    def __iter__(self):
+        if self.use_cache:
+            yield from self._cached_items()
+            return
+        for row in self._iter_rows():
+            yield InventoryItem(row, self._positions)
+
+
+class _LineList(list):
+    '''csv.writer가 줄마다 한 번씩 부르는 write를 받아 줄 목록으로 모읍니다.'''
+
+    write = list.append
+
+
+class CachedInventoryItem(InventoryItem):
+    '''
+    캐시에서 읽은 인벤토리 한 줄. 열 값은 캐시에 저장된 것을 그대로 쓰고,
+    row(원래 값들)는 다시 CSV로 쓰거나 출력할 때만 저장해 둔 줄을 파싱해서 만듭니다.
+    '''
+
+    __slots__ = ('_line',)
+
+    def __init__(self, line, values):
+        # 항목 수만큼 불리므로 setattr 반복 대신 COLUMNS 순서대로 한 번에 대입합니다.
+        self._line = line
+        self.substance, self.weight, self.specific_gravity, self.strength, self.flammability = values
+
+    @property
+    def row(self):
+        return next(csv.reader((self._line.decode('utf-8'),)))
+
+
+NUMERIC_COLUMNS = tuple(name for name, _, convert in COLUMNS if convert is to_float)
+
+
+def select_items(items, column='flammability', minimum=None, maximum=None, top_k=None, descending=True,
+                 sort=False):
+    '''
+    column 값이 [minimum, maximum] 안에 드는 항목을 고릅니다. (값이 없는 항목은 제외)
+    - 기본: 조건에 맞는 항목을 읽는 순서대로 하나씩 내보냅니다. (메모리 일정)
+    - top_k: 힙으로 상위(descending=False면 하위) k개만 유지해 정렬된 목록으로 반환합니다. O(n log k)
+    - sort: 조건에 맞는 항목 전체를 모아 정렬합니다.
+    '''
+    key = attrgetter(column)
+    matched = (
+        item for item in items
+        if key(item) is not None
+        and (minimum is None or key(item) >= minimum)
+        and (maximum is None or key(item) <= maximum)
+    )
+    if top_k is not None:
+        select = heapq.nlargest if descending else heapq.nsmallest
+        return select(top_k, matched, key=key)
+    if sort:
+        return sorted(matched, key=key, reverse=descending)
+    return matched
+
+
+def write_items(items, reader, path, echo=True):
+    '''항목을 받는 대로 CSV 파일에 쓰고(echo면 화면에도 출력) 쓴 항목 수를 반환합니다.'''
+    # 입력 파일을 열지 못하면 기존 결과 파일을 지우지 않도록, 첫 항목을 받은 뒤에 결과 파일을 엽니다.
+    # (헤더도 reader가 읽기를 시작해야 알 수 있습니다.)
+    items = iter(items)
+    first = next(items, None)
+    count = 0
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(reader.header)
+        if first is None:
+            return count
+        for item in itertools.chain((first,), items):
+            writer.writerow(item.row)
+            if echo:
+                print(item.as_dict(reader.header))
+            count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description='화성 기지 인벤토리에서 위험 물질 고르기')
+    parser.add_argument('--input', default=os.path.join(SCRIPT_DIR, INVENTORY_FILE), help='인벤토리 CSV 파일 경로')
+    parser.add_argument('--output', default=os.path.join(SCRIPT_DIR, OUTPUT_FILE), help='결과 CSV 파일 경로')
+    parser.add_argument('--column', choices=NUMERIC_COLUMNS, default='flammability', help='기준 열')
+    parser.add_argument('--min', type=float, default=None,
+                        help=f'최솟값 (기준 열이 flammability이고 --min/--max가 없으면 {FLAMMABILITY_THRESHOLD})')
+    parser.add_argument('--max', type=float, default=None, help='최댓값')
+    parser.add_argument('--top', type=int, default=None, help='값이 큰 순서로 상위 k개만 저장합니다.')
+    parser.add_argument('--ascending', action='store_true', help='--top/--sort에서 값이 작은 순서로 고릅니다.')
+    parser.add_argument('--sort', action='store_true', help='조건에 맞는 항목 전체를 정렬해서 저장합니다.')
+    parser.add_argument('--cache', action='store_true', help='파싱 결과를 캐시해서 다음 실행부터 재사용합니다. (NumPy 필요)')
+    args = parser.parse_args()
+
+    minimum = args.min
+    if args.column == 'flammability' and args.min is None and args.max is None:
+        minimum = FLAMMABILITY_THRESHOLD
+
+    if args.cache and np is None:
+        print('--cache를 쓰려면 NumPy가 필요합니다.')
+        exit(1)
+    reader = InventoryReader(args.input, args.cache)
+    items = select_items(reader, args.column, minimum, args.max, args.top, not args.ascending, args.sort)
+
+    try:
+        write_items(items, reader, args.output)
+    except FileNotFoundError:
+        print("로그 파일이 존재하지 않습니다.")
+        exit(1)
+    except PermissionError:
+        print("로그 파일에 접근 권한이 없습니다.")
+        exit(1)
+    except ValueError as e:
+        print(f'오류: {e}')
+        exit(1)
+
+    if reader.skipped:
+        print(f'형식이 맞지 않아 건너뛴 줄: {reader.skipped}개')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+'''
+CSV를 파싱한 결과(NumPy 배열들)를 .npy 파일로 저장해 두고, 원본이 바뀌지 않았으면 다시 파싱하지 않고
+메모리 매핑(mmap_mode='r')으로 바로 불러오는 캐시.
+
+캐시 위치: CACHE_DIR/<이름공간>/<원본 경로 해시>-<도장>/<배열 이름>.npy
+- 도장(stamp)은 원본 파일의 (수정 시각, 크기)이고, use_hash=True면 내용의 SHA-256입니다.
+- 원본이 바뀌면 도장이 달라져 자동으로 새로 만들고, 같은 원본의 예전 캐시는 지웁니다.
+- 새 캐시는 임시 디렉터리에 다 쓴 뒤 이름을 바꿔서, 중간에 끊겨도 반쯤 쓴 캐시를 읽지 않습니다.
+'''
+
+import hashlib
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(SCRIPT_DIR, '.cache')
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def source_stamp(path, use_hash=False):
+    '''원본 파일이 바뀌었는지 가려내는 값.'''
+    if not use_hash:
+        stat = os.stat(path)
+        return f'{stat.st_mtime_ns}-{stat.st_size}'
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()[:32]
+
+
+def _load_entry(entry):
+    return {
+        name[:-len('.npy')]: np.load(os.path.join(entry, name), mmap_mode='r', allow_pickle=False)
+        for name in os.listdir(entry) if name.endswith('.npy')
+    }
+
+
+def cached_arrays(path, namespace, build, use_hash=False, cache_dir=CACHE_DIR):
+    '''
+    path를 build(path)로 파싱한 {이름: 배열} 결과를 캐시에서 돌려줍니다.
+    원본이 그대로면 build를 부르지 않고 .npy를 메모리 매핑해서 읽기 전용 배열로 반환합니다.
+    '''
+    path_key = hashlib.sha1(os.path.abspath(path).encode('utf-8')).hexdigest()[:16]
+    namespace_dir = os.path.join(cache_dir, namespace)
+    entry = os.path.join(namespace_dir, f'{path_key}-{source_stamp(path, use_hash)}')
+    if os.path.isdir(entry):
+        return _load_entry(entry)
+
+    arrays = build(path)
+    os.makedirs(namespace_dir, exist_ok=True)
+    tmp_entry = tempfile.mkdtemp(prefix='.tmp-', dir=namespace_dir)
+    try:
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp_entry, name + '.npy'), np.asarray(array), allow_pickle=False)
+        os.rename(tmp_entry, entry)
+    except OSError:
+        # 다른 프로세스가 같은 캐시를 먼저 만들었거나 쓸 수 없는 경우: 파싱 결과를 그대로 씁니다.
+        shutil.rmtree(tmp_entry, ignore_errors=True)
+        return arrays
+
+    for name in os.listdir(namespace_dir):
+        if name.startswith(path_key + '-') and os.path.join(namespace_dir, name) != entry:
+            shutil.rmtree(os.path.join(namespace_dir, name), ignore_errors=True)
+    return _load_entry(entry)
+
+
+def clear_cache(namespace=None, cache_dir=CACHE_DIR):
+    '''캐시를 지웁니다. namespace를 주면 그 이름공간만 지웁니다.'''
+    shutil.rmtree(cache_dir if namespace is None else os.path.join(cache_dir, namespace), ignore_errors=True)
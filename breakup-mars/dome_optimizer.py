@@ -0,0 +1,258 @@
+'''
+조건을 만족하는 반구 돔 설계 찾기.
+
+"면적이 X m² 이상이고 화성 무게가 Y kg 이하인 돔 중 가장 가벼운 것"처럼 묻으면,
+testbw.evaluate_domes(벡터화된 계산)로 재질 x 지름 x 두께 격자를 프로세스 풀에서 나눠 계산하고,
+가장 좋은 격자점 주변을 이분법(지름, 제약 경계)과 황금분할 탐색(두께)으로 다듬습니다.
+면적(클수록 좋음)과 무게(작을수록 좋음)의 파레토 경계도 함께 구합니다.
+'''
+
+import argparse
+import csv
+import math
+import os
+import sys
+from collections import namedtuple
+from multiprocessing import Pool
+
+import numpy as np
+
+from testbw import evaluate_domes, material_density
+
+DomeDesign = namedtuple('DomeDesign', 'material diameter thickness area weight')
+
+OBJECTIVES = ('weight', 'area')
+DEFAULT_DIAMETER_RANGE = (1.0, 100.0)
+DEFAULT_THICKNESS_RANGE = (0.1, 10.0)
+DEFAULT_GRID = (2000, 200)
+# 한 작업(프로세스 풀에 넘기는 단위)에서 계산할 지름 격자 수
+DIAMETER_CHUNK = 250
+REFINE_TOLERANCE = 1e-9
+GOLDEN_RATIO = (math.sqrt(5) - 1) / 2
+
+
+def make_design(material, diameter, thickness):
+    result = evaluate_domes(diameter, material, thickness)
+    return DomeDesign(material, float(diameter), float(thickness), float(result['area']), float(result['weight']))
+
+
+def is_feasible(design, min_area, max_weight):
+    return design.area >= min_area and design.weight <= max_weight
+
+
+def objective_value(design, objective):
+    '''작을수록 좋은 값. (area 목표는 면적을 최대화하므로 부호를 뒤집습니다)'''
+    return design.weight if objective == 'weight' else -design.area
+
+
+def pareto_front(area, weight):
+    '''면적은 클수록, 무게는 작을수록 좋을 때 어느 점에도 지배되지 않는 점들의 위치를 무게 순으로 반환합니다.'''
+    area = np.asarray(area).ravel()
+    weight = np.asarray(weight).ravel()
+    if area.size == 0:
+        return np.array([], dtype=np.intp)
+    # 무게 오름차순(같으면 면적 내림차순)으로 훑으면서 지금까지의 최대 면적을 넘는 점만 남깁니다.
+    order = np.lexsort((-area, weight))
+    sorted_area = area[order]
+    best_before = np.maximum.accumulate(np.concatenate(([-np.inf], sorted_area[:-1])))
+    return order[sorted_area > best_before]
+
+
+def evaluate_chunk(task):
+    '''
+    (프로세스 풀 작업) 재질 하나와 지름 일부 x 두께 전체 격자를 계산해
+    제약을 만족하는 점 중 목표가 가장 좋은 설계와, 이 조각의 파레토 경계 점들을 반환합니다.
+    '''
+    material, diameters, thicknesses, min_area, max_weight, objective = task
+    result = evaluate_domes(diameters[:, None], material, thicknesses[None, :])
+    area = np.broadcast_to(result['area'], result['weight'].shape)
+    weight = result['weight']
+    feasible = (area >= min_area) & (weight <= max_weight)
+    if not feasible.any():
+        return None, []
+
+    rows, columns = np.nonzero(feasible)
+    feasible_area, feasible_weight = area[rows, columns], weight[rows, columns]
+    score = feasible_weight if objective == 'weight' else -feasible_area
+    best = int(np.argmin(score))
+
+    def design(position):
+        return DomeDesign(material, float(diameters[rows[position]]), float(thicknesses[columns[position]]),
+                          float(feasible_area[position]), float(feasible_weight[position]))
+
+    front = [design(position) for position in pareto_front(feasible_area, feasible_weight)]
+    return design(best), front
+
+
+def grid_search(materials, diameters, thicknesses, min_area=0.0, max_weight=math.inf, objective='weight',
+                processes=None):
+    '''재질 x 지름 x 두께 격자 전체를 프로세스 풀에서 계산하고 (가장 좋은 설계 또는 None, 파레토 경계)를 반환합니다.'''
+    tasks = [
+        (material, diameters[start:start + DIAMETER_CHUNK], thicknesses, min_area, max_weight, objective)
+        for material in materials
+        for start in range(0, len(diameters), DIAMETER_CHUNK)
+    ]
+    processes = min(processes or os.cpu_count() or 1, len(tasks))
+    if processes > 1:
+        with Pool(processes) as pool:
+            results = pool.map(evaluate_chunk, tasks)
+    else:
+        results = list(map(evaluate_chunk, tasks))
+
+    candidates = [best for best, _ in results if best is not None]
+    if not candidates:
+        return None, []
+    best = min(candidates, key=lambda design: objective_value(design, objective))
+
+    # 조각별 파레토 점들을 모아 전체 파레토 경계를 다시 구합니다.
+    points = [design for _, front in results for design in front]
+    front = pareto_front([design.area for design in points], [design.weight for design in points])
+    return best, [points[position] for position in front]
+
+
+def bisect_boundary(predicate, good, bad, tolerance=REFINE_TOLERANCE):
+    '''predicate(good)가 참, predicate(bad)가 거짓일 때 참인 쪽에서 경계에 가장 가까운 값을 이분법으로 찾습니다.'''
+    while abs(bad - good) > tolerance:
+        middle = (good + bad) / 2
+        if predicate(middle):
+            good = middle
+        else:
+            bad = middle
+    return good
+
+
+def golden_section_minimize(function, low, high, tolerance=REFINE_TOLERANCE):
+    '''[low, high]에서 단봉(unimodal) 함수 function이 가장 작아지는 위치를 황금분할 탐색으로 찾습니다.'''
+    left = high - GOLDEN_RATIO * (high - low)
+    right = low + GOLDEN_RATIO * (high - low)
+    left_value, right_value = function(left), function(right)
+    while high - low > tolerance:
+        if left_value <= right_value:
+            high, right, right_value = right, left, left_value
+            left = high - GOLDEN_RATIO * (high - low)
+            left_value = function(left)
+        else:
+            low, left, left_value = left, right, right_value
+            right = low + GOLDEN_RATIO * (high - low)
+            right_value = function(right)
+    candidates = [(function(x), x) for x in (low, high, (low + high) / 2)]
+    return min(candidates)[1]
+
+
+def refine(best, diameter_step, thickness_step, diameter_range, thickness_range, min_area=0.0,
+           max_weight=math.inf, objective='weight'):
+    '''
+    격자에서 찾은 설계를 이웃 격자 칸 안에서 다듬습니다.
+    - 두께: 지름을 고정하고 제약을 지키는 가장 가벼운 두께를 황금분할 탐색으로 찾습니다.
+      (면적 목표여도 가벼울수록 지름을 더 키울 여유가 생깁니다)
+    - 지름: 무게 목표면 면적 제약을 만족하는 가장 작은 지름, 면적 목표면 무게 제약을 만족하는 가장 큰 지름을
+      이분법으로 찾습니다. (면적과 무게 모두 지름이 커질수록 커지므로 제약 경계가 하나입니다)
+    '''
+    material = best.material
+
+    def penalized(diameter, thickness, goal=objective):
+        design = make_design(material, diameter, thickness)
+        return objective_value(design, goal) if is_feasible(design, min_area, max_weight) else math.inf
+
+    low = max(thickness_range[0], best.thickness - thickness_step)
+    high = min(thickness_range[1], best.thickness + thickness_step)
+    thickness = golden_section_minimize(lambda value: penalized(best.diameter, value, 'weight'), low, high)
+    if penalized(best.diameter, thickness, 'weight') > best.weight:
+        thickness = best.thickness
+
+    def feasible(diameter):
+        return is_feasible(make_design(material, diameter, thickness), min_area, max_weight)
+
+    if objective == 'weight':
+        bad = max(diameter_range[0], best.diameter - diameter_step)
+    else:
+        bad = min(diameter_range[1], best.diameter + diameter_step)
+    diameter = best.diameter
+    if not feasible(bad):
+        diameter = bisect_boundary(feasible, best.diameter, bad)
+    elif objective_value(make_design(material, bad, thickness), objective) < penalized(diameter, thickness):
+        diameter = bad
+
+    refined = make_design(material, diameter, thickness)
+    if objective_value(refined, objective) <= objective_value(best, objective):
+        return refined
+    return best
+
+
+def optimize(min_area=0.0, max_weight=math.inf, objective='weight', materials=None,
+             diameter_range=DEFAULT_DIAMETER_RANGE, thickness_range=DEFAULT_THICKNESS_RANGE, grid=DEFAULT_GRID,
+             processes=None):
+    '''
+    제약(면적 >= min_area, 화성 무게 <= max_weight)을 만족하는 설계 중
+    objective('weight': 가장 가벼운, 'area': 가장 넓은) 설계와 파레토 경계를 반환합니다.
+    조건을 만족하는 설계가 없으면 (None, [])입니다.
+    '''
+    if objective not in OBJECTIVES:
+        raise ValueError(f'지원하지 않는 목표입니다: {objective} (가능: {", ".join(OBJECTIVES)})')
+    materials = list(materials or material_density)
+    unknown = [material for material in materials if material not in material_density]
+    if unknown:
+        raise ValueError(f'알 수 없는 재질: {", ".join(unknown)}')
+
+    diameters = np.linspace(*diameter_range, grid[0])
+    thicknesses = np.linspace(*thickness_range, grid[1])
+    best, front = grid_search(materials, diameters, thicknesses, min_area, max_weight, objective, processes)
+    if best is None:
+        return None, []
+
+    diameter_step = diameters[1] - diameters[0] if len(diameters) > 1 else 0.0
+    thickness_step = thicknesses[1] - thicknesses[0] if len(thicknesses) > 1 else 0.0
+    best = refine(best, diameter_step, thickness_step, diameter_range, thickness_range, min_area, max_weight,
+                  objective)
+    return best, front
+
+
+def format_design(design):
+    return (f'재질 ⇒ {design.material}, 지름 ⇒ {design.diameter:.4f} m, 두께 ⇒ {design.thickness:.4f} cm, '
+            f'면적 ⇒ {design.area:.3f} m², 무게 ⇒ {design.weight:.3f} kg')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='조건을 만족하는 반구 돔 설계 찾기')
+    parser.add_argument('--min-area', type=float, default=0.0, help='최소 면적 (m²)')
+    parser.add_argument('--max-weight', type=float, default=math.inf, help='최대 화성 무게 (kg)')
+    parser.add_argument('--objective', choices=OBJECTIVES, default='weight',
+                        help='weight: 가장 가벼운 설계, area: 가장 넓은 설계')
+    parser.add_argument('--material', action='append', help='탐색할 재질 (여러 번 지정 가능, 기본값: 전체)')
+    parser.add_argument('--diameter', type=float, nargs=2, default=DEFAULT_DIAMETER_RANGE, metavar=('MIN', 'MAX'),
+                        help='지름 범위 (m)')
+    parser.add_argument('--thickness', type=float, nargs=2, default=DEFAULT_THICKNESS_RANGE, metavar=('MIN', 'MAX'),
+                        help='두께 범위 (cm)')
+    parser.add_argument('--grid', type=int, nargs=2, default=DEFAULT_GRID, metavar=('DIAMETERS', 'THICKNESSES'),
+                        help='지름/두께 격자 수')
+    parser.add_argument('--processes', type=int, default=None, help='사용할 프로세스 수 (기본값: CPU 코어 수)')
+    parser.add_argument('--pareto', metavar='CSV', help="면적-무게 파레토 경계를 저장할 CSV 파일 ('-'면 화면에 출력)")
+    args = parser.parse_args()
+
+    try:
+        best, front = optimize(args.min_area, args.max_weight, args.objective, args.material, args.diameter,
+                               args.thickness, args.grid, args.processes)
+    except ValueError as e:
+        print(f'오류: {e}')
+        exit(1)
+
+    if best is None:
+        print('조건을 만족하는 설계가 없습니다.')
+        exit(1)
+    print(format_design(best))
+
+    if args.pareto:
+        f = sys.stdout if args.pareto == '-' else open(args.pareto, 'w', encoding='utf-8', newline='')
+        try:
+            writer = csv.writer(f, lineterminator='\n')
+            writer.writerow(DomeDesign._fields)
+            writer.writerows(front)
+        finally:
+            if f is not sys.stdout:
+                f.close()
+        if f is not sys.stdout:
+            print(f"파레토 경계 {len(front)}개 설계를 '{args.pareto}' 파일에 저장했습니다.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+'''
+화성 기지 인벤토리에 대한 여러 조건 조회.
+
+숫자 열(weight, specific_gravity, flammability)마다 값 순으로 정렬한 색인을 만들어 두고,
+'flammability>0.7 AND specific_gravity<1' 같은 범위/복합 조건을 bisect로 찾습니다.
+조건이 여러 개면 가장 좁은 범위의 후보만 꺼낸 뒤 나머지 조건을 확인하므로 전체를 다시 훑지 않습니다.
+'''
+
+import argparse
+import bisect
+import os
+import re
+
+from analyze_mars import INVENTORY_FILE, NUMERIC_COLUMNS, SCRIPT_DIR, InventoryReader, write_items
+
+CONDITION_PATTERN = re.compile(r'^\s*([a-z_]+)\s*(>=|<=|==|=|>|<)\s*([-+]?[0-9.]+(?:e[-+]?[0-9]+)?)\s*$', re.I)
+
+
+def parse_condition(text):
+    ''''flammability>0.7' 같은 문자열을 (열 이름, 연산자, 값)으로 바꿉니다.'''
+    match = CONDITION_PATTERN.match(text)
+    if match is None:
+        raise ValueError(f"조건 형식이 올바르지 않습니다: '{text}' (예: flammability>0.7)")
+    column, operator, value = match.groups()
+    column = column.lower()
+    if column not in NUMERIC_COLUMNS:
+        raise ValueError(f"숫자 열이 아닙니다: '{column}' (가능한 열: {', '.join(NUMERIC_COLUMNS)})")
+    return column, '==' if operator == '=' else operator, float(value)
+
+
+class ColumnIndex:
+    '''한 숫자 열의 (값, 항목 번호)를 값 순으로 정렬해 둔 색인. 값이 없는 항목은 들어가지 않습니다.'''
+
+    def __init__(self, items, column):
+        pairs = sorted(
+            (getattr(item, column), position) for position, item in enumerate(items)
+            if getattr(item, column) is not None
+        )
+        self.values = [value for value, _ in pairs]
+        self.positions = [position for _, position in pairs]
+
+    def bounds(self, conditions):
+        '''(연산자, 값) 조건들을 모두 만족하는 구간을 values의 [start, end) 위치로 반환합니다.'''
+        start, end = 0, len(self.values)
+        for operator, value in conditions:
+            if operator in ('>', '>=', '=='):
+                find = bisect.bisect_right if operator == '>' else bisect.bisect_left
+                start = max(start, find(self.values, value))
+            if operator in ('<', '<=', '=='):
+                find = bisect.bisect_left if operator == '<' else bisect.bisect_right
+                end = min(end, find(self.values, value))
+        return start, max(start, end)
+
+
+class InventoryIndex:
+    '''인벤토리 항목과 숫자 열 색인을 함께 들고 있는 조회 객체.'''
+
+    def __init__(self, items, header=None):
+        self.items = list(items)
+        self.header = header
+        self.columns = {column: ColumnIndex(self.items, column) for column in NUMERIC_COLUMNS}
+
+    @classmethod
+    def from_file(cls, path, use_cache=False):
+        reader = InventoryReader(path, use_cache)
+        items = list(reader)
+        return cls(items, reader.header)
+
+    def query(self, conditions, order_by=None, descending=False):
+        '''
+        (열, 연산자, 값) 조건을 모두(AND) 만족하는 항목 목록을 반환합니다.
+        order_by가 없으면 파일 순서, 있으면 그 열의 값 순서입니다. 조건이 없으면 전체 항목입니다.
+        '''
+        grouped = {}
+        for column, operator, value in conditions:
+            grouped.setdefault(column, []).append((operator, value))
+
+        if grouped:
+            ranges = {column: self.columns[column].bounds(rules) for column, rules in grouped.items()}
+            # 가장 좁은 구간의 열에서 후보를 꺼내고, 나머지 열은 값 구간 안에 드는지만 확인합니다.
+            narrowest = min(ranges, key=lambda column: ranges[column][1] - ranges[column][0])
+            start, end = ranges[narrowest]
+            candidates = self.columns[narrowest].positions[start:end]
+            for column, (low, high) in ranges.items():
+                if column == narrowest:
+                    continue
+                if low == high:
+                    return []
+                values = self.columns[column].values
+                low_value, high_value = values[low], values[high - 1]
+                candidates = [
+                    position for position in candidates
+                    if getattr(self.items[position], column) is not None
+                    and low_value <= getattr(self.items[position], column) <= high_value
+                ]
+        else:
+            candidates = range(len(self.items))
+
+        if order_by is None:
+            return [self.items[position] for position in sorted(candidates)]
+        # 값이 없는 항목은 정렬 방향과 관계없이 맨 뒤에 둡니다.
+        results = [self.items[position] for position in sorted(candidates)]
+        missing = [item for item in results if getattr(item, order_by) is None]
+        results = [item for item in results if getattr(item, order_by) is not None]
+        results.sort(key=lambda item: getattr(item, order_by), reverse=descending)
+        return results + missing
+
+
+def main():
+    parser = argparse.ArgumentParser(description='화성 기지 인벤토리 복합 조건 조회')
+    parser.add_argument('conditions', nargs='*', help="조건 (AND로 결합, 예: 'flammability>0.7' 'specific_gravity<1')")
+    parser.add_argument('--input', default=os.path.join(SCRIPT_DIR, INVENTORY_FILE), help='인벤토리 CSV 파일 경로')
+    parser.add_argument('--output', help='결과를 저장할 CSV 파일 경로')
+    parser.add_argument('--order-by', choices=NUMERIC_COLUMNS, help='정렬 기준 열')
+    parser.add_argument('--cache', action='store_true', help='파싱 결과를 캐시해서 다음 실행부터 재사용합니다. (NumPy 필요)')
+    parser.add_argument('--descending', action='store_true', help='--order-by 열의 큰 값부터 정렬합니다.')
+    args = parser.parse_args()
+
+    try:
+        conditions = [parse_condition(text) for text in args.conditions]
+        index = InventoryIndex.from_file(args.input, args.cache)
+    except FileNotFoundError:
+        print('인벤토리 파일이 존재하지 않습니다.')
+        exit(1)
+    except PermissionError:
+        print('인벤토리 파일에 접근 권한이 없습니다.')
+        exit(1)
+    except ValueError as e:
+        print(f'오류: {e}')
+        exit(1)
+
+    results = index.query(conditions, args.order_by, args.descending)
+    if args.output:
+        write_items(results, index, args.output, echo=False)
+        print(f"{len(results)}개 항목을 '{args.output}' 파일에 저장했습니다.")
+    else:
+        for item in results:
+            print(item.as_dict(index.header))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,233 @@
+'''
+여러 미션 컴퓨터 로그(컴퓨터별·날짜별 파일)를 한꺼번에 분석합니다.
+
+- map: 파일마다 프로세스 풀에서 파싱하고 부분 집계(시간대별 이벤트 수, 첫/마지막 이상 징후)를 만듭니다.
+- reduce: 부분 집계를 합치고, 필요하면 파일별로 정렬된 run을 heapq.merge로 스트리밍 k-way 병합해
+  하나의 시간순 로그로 씁니다. 레코드는 프로세스 사이로 보내지 않고 파일로만 주고받으므로
+  부모 프로세스의 메모리는 파일 수에만 비례합니다.
+
+Python 기본 모듈만 사용합니다.
+'''
+
+import argparse
+import glob
+import heapq
+import json
+import os
+import tempfile
+from collections import Counter
+from multiprocessing import Pool
+from operator import itemgetter
+
+from main import ANOMALY_KEYWORDS, iter_logs
+from log_store import tokenize
+
+LOG_PATTERN = '*.log'
+# 'YYYY-MM-DD HH:MM:SS'에서 시간대(YYYY-MM-DD HH)까지의 길이
+HOUR_PREFIX_LENGTH = 13
+# 시간순이 아닌 파일을 정렬할 때 한 번에 메모리에 올려 정렬하는 레코드 수
+SORT_BUFFER_RECORDS = 200_000
+
+
+def expand_paths(patterns):
+    '''디렉터리나 glob 패턴 목록을 실제 로그 파일 경로 목록으로 바꿉니다. (중복 제거, 이름순)'''
+    paths = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, LOG_PATTERN)
+        paths.update(path for path in glob.glob(pattern) if os.path.isfile(path))
+    return sorted(paths)
+
+
+def is_anomaly(event, message):
+    return not tokenize(event + ' ' + message).isdisjoint(ANOMALY_KEYWORDS)
+
+
+def analyze_file(path, run_dir=None):
+    '''
+    (map 단계) 로그 파일 하나를 읽어 부분 집계를 반환합니다.
+    run_dir를 주면 병합에 쓸 시간순 run 파일 경로('run')도 함께 반환합니다.
+    파일이 이미 시간순이면 원본을 그대로 run으로 쓰고, 아니면 run_dir에 정렬한 run을 씁니다.
+    '''
+    events = Counter()
+    first_anomaly = last_anomaly = None
+    count = 0
+    in_order = True
+    previous = None
+
+    for record in iter_logs(path):
+        timestamp, event, message = record
+        count += 1
+        events[timestamp[:HOUR_PREFIX_LENGTH], event] += 1
+        if is_anomaly(event, message):
+            if first_anomaly is None or timestamp < first_anomaly[0]:
+                first_anomaly = record
+            if last_anomaly is None or timestamp >= last_anomaly[0]:
+                last_anomaly = record
+        if previous is not None and timestamp < previous:
+            in_order = False
+        previous = timestamp
+
+    run = None
+    if run_dir is not None:
+        run = path if in_order else sort_run(path, run_dir)
+
+    return {
+        'path': path,
+        'records_count': count,
+        'events': events,
+        'first_anomaly': first_anomaly,
+        'last_anomaly': last_anomaly,
+        'run': run,
+    }
+
+
+def _write_run(records, run_dir):
+    fd, run_path = tempfile.mkstemp(suffix='.log', dir=run_dir)
+    with open(fd, 'w', encoding='utf-8') as f:
+        for timestamp, event, message in records:
+            f.write(f'{timestamp},{event},{message}\n')
+    return run_path
+
+
+def sort_run(path, run_dir, buffer_records=SORT_BUFFER_RECORDS):
+    '''
+    로그 파일 하나를 시간순으로 정렬한 run 파일을 run_dir에 쓰고 그 경로를 반환합니다. (외부 정렬)
+    buffer_records개씩 정렬해 조각으로 쓴 뒤 조각들을 스트리밍 병합하므로 메모리는 파일 크기와 관계없이 일정합니다.
+    같은 시각의 레코드는 파일에 적힌 순서를 유지합니다.
+    '''
+    spills = []
+    buffer = []
+    for record in iter_logs(path):
+        buffer.append(record)
+        if len(buffer) >= buffer_records:
+            buffer.sort(key=itemgetter(0))
+            spills.append(_write_run(buffer, run_dir))
+            buffer = []
+    buffer.sort(key=itemgetter(0))
+    if not spills:
+        return _write_run(buffer, run_dir)
+    if buffer:
+        spills.append(_write_run(buffer, run_dir))
+    run_path = _write_run(heapq.merge(*(iter_logs(spill) for spill in spills), key=itemgetter(0)), run_dir)
+    for spill in spills:
+        os.remove(spill)
+    return run_path
+
+
+def _analyze_task(task):
+    return analyze_file(*task)
+
+
+def merge_results(results):
+    '''(reduce 단계) 파일별 부분 집계를 하나로 합칩니다.'''
+    total = {
+        'files': [],
+        'records_count': 0,
+        'events': Counter(),
+        'first_anomaly': None,
+        'last_anomaly': None,
+    }
+    for result in results:
+        total['files'].append(result['path'])
+        total['records_count'] += result['records_count']
+        total['events'].update(result['events'])
+        first, last = result['first_anomaly'], result['last_anomaly']
+        if first is not None and (total['first_anomaly'] is None or first[0] < total['first_anomaly'][0]):
+            total['first_anomaly'] = first
+        if last is not None and (total['last_anomaly'] is None or last[0] >= total['last_anomaly'][0]):
+            total['last_anomaly'] = last
+    total['files'].sort()
+    return total
+
+
+def analyze_logs(paths, processes=None, merged_path=None):
+    '''
+    여러 로그 파일을 프로세스 풀에서 나눠 분석하고 합친 집계를 반환합니다.
+    merged_path를 주면 모든 로그를 시간순으로 병합한 로그 파일도 씁니다.
+    '''
+    if merged_path is None:
+        return merge_results(_map_files(paths, processes))
+
+    # 정렬한 run은 병합 결과 옆의 임시 디렉터리에 두고, 병합이 끝나면 지웁니다.
+    merged_dir = os.path.dirname(os.path.abspath(merged_path))
+    with tempfile.TemporaryDirectory(prefix='.merge-', dir=merged_dir) as run_dir:
+        results = _map_files(paths, processes, run_dir)
+        results.sort(key=itemgetter('path'))
+        runs = [iter_logs(result.pop('run')) for result in results]
+        with open(merged_path, 'w', encoding='utf-8') as f:
+            f.write('timestamp,event,message\n')
+            for timestamp, event, message in heapq.merge(*runs, key=itemgetter(0)):
+                f.write(f'{timestamp},{event},{message}\n')
+    return merge_results(results)
+
+
+def _map_files(paths, processes=None, run_dir=None):
+    # 큰 파일부터 나눠 줘야 마지막에 큰 파일 하나만 남아 코어가 노는 일이 줄어듭니다.
+    tasks = [(path, run_dir) for path in sorted(paths, key=os.path.getsize, reverse=True)]
+    processes = min(processes or os.cpu_count() or 1, len(tasks)) or 1
+    if processes == 1:
+        return [_analyze_task(task) for task in tasks]
+    with Pool(processes) as pool:
+        return list(pool.imap_unordered(_analyze_task, tasks))
+
+
+def format_report(total):
+    '''집계 결과를 시간대별 이벤트 수 표와 첫/마지막 이상 징후로 정리한 문자열을 반환합니다.'''
+    lines = [f'로그 파일 {len(total["files"])}개, 레코드 {total["records_count"]:,}개']
+    event_types = sorted({event for _, event in total['events']})
+    hours = sorted({hour for hour, _ in total['events']})
+    if event_types:
+        lines.append('')
+        lines.append('시간대'.ljust(HOUR_PREFIX_LENGTH + 3) + ''.join(event.rjust(10) for event in event_types))
+        for hour in hours:
+            counts = ''.join(str(total['events'][hour, event]).rjust(10) for event in event_types)
+            lines.append(f'{hour}:00'.ljust(HOUR_PREFIX_LENGTH + 3) + counts)
+    lines.append('')
+    for label, key in (('첫 이상 징후', 'first_anomaly'), ('마지막 이상 징후', 'last_anomaly')):
+        record = total[key]
+        lines.append(f'{label}: ' + (', '.join(record) if record else '없음'))
+    return '\n'.join(lines)
+
+
+def to_json(total):
+    '''집계 결과를 JSON으로 저장할 수 있는 dict로 바꿉니다. (events: 시간대 -> 이벤트 종류 -> 수)'''
+    events = {}
+    for (hour, event), count in sorted(total['events'].items()):
+        events.setdefault(hour, {})[event] = count
+    return {
+        'files': total['files'],
+        'records_count': total['records_count'],
+        'events_per_hour': events,
+        'first_anomaly': total['first_anomaly'],
+        'last_anomaly': total['last_anomaly'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='여러 미션 컴퓨터 로그 병렬 분석')
+    parser.add_argument('logs', nargs='+', help="로그 디렉터리 또는 glob 패턴 (예: 'logs/*.log')")
+    parser.add_argument('--processes', type=int, default=None, help='사용할 프로세스 수 (기본값: CPU 코어 수)')
+    parser.add_argument('--merged', help='모든 로그를 시간순으로 병합해 저장할 파일 경로')
+    parser.add_argument('--json', help='집계 결과를 저장할 JSON 파일 경로')
+    args = parser.parse_args()
+
+    paths = expand_paths(args.logs)
+    if not paths:
+        print('분석할 로그 파일이 없습니다.')
+        exit(1)
+
+    try:
+        total = analyze_logs(paths, args.processes, args.merged)
+    except PermissionError:
+        print('로그 파일에 접근 권한이 없습니다.')
+        exit(1)
+
+    print(format_report(total))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(to_json(total), f, ensure_ascii=False, indent=4)
+
+
+if __name__ == '__main__':
+    main()
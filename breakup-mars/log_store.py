@@ -0,0 +1,462 @@
+'''
+mission_computer_main.log 위에 디스크 색인을 만들어 빠르게 조회하는 로그 저장소.
+
+- 시간 색인: timestamp 순으로 정렬된 (timestamp, 줄 시작 바이트 위치) 목록 -> 구간 조회는 bisect로 처리
+- 역색인: 소문자 토큰 -> 그 토큰이 나오는 줄의 바이트 위치 목록 -> 대소문자 구분 없는 키워드 검색
+- 색인은 로그 옆의 .idx 디렉터리에 저장하고, 로그가 늘어나면 새로 추가된 바이트만 색인합니다.
+
+색인 디렉터리 구조 (리틀 엔디안)
+    meta.json : 로그 파일 식별값, 색인한 크기, 시간 색인 레코드 수와 정렬 구간(run), 역색인 조각 목록
+    time.bin  : (timestamp 19바이트, 빈 1바이트, uint64 줄 위치) 28바이트 레코드. 덧붙이기만 하며 run마다 정렬되어 있습니다.
+    NNNNNN.post: 역색인 조각. 헤더, {토큰: [시작, 개수]} JSON, uint64 줄 위치 배열
+저장할 때는 새로 추가된 레코드만 time.bin 끝에 덧붙이고 새 조각 하나를 쓴 뒤 meta.json을 교체합니다.
+조회할 때는 meta.json만 읽고 나머지는 mmap으로 필요한 부분만 봅니다.
+
+Python 기본 모듈만 사용합니다.
+'''
+
+import argparse
+import bisect
+import contextlib
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+from array import array
+
+from main import parse_line
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+INDEX_SUFFIX = '.idx'
+INDEX_VERSION = 3
+META_FILE = 'meta.json'
+TIME_FILE = 'time.bin'
+SEGMENT_SUFFIX = '.post'
+SEGMENT_MAGIC = b'LOGPOST1'
+SEGMENT_HEADER = struct.Struct('<8sQ')
+TIMESTAMP_WIDTH = 19
+TIME_RECORD = struct.Struct(f'<{TIMESTAMP_WIDTH}sxQ')
+ALIGNMENT = 8
+# 시간 색인의 정렬 구간(run)이 이보다 많아지면 하나로 합칩니다. (순서가 어긋난 줄이 들어올 때만 run이 늘어남)
+MAX_TIME_RUNS = 8
+# update가 메모리에 모아 두는 줄 수. 넘으면 중간에 저장해서 처음 색인할 때도 메모리를 일정하게 유지합니다.
+UPDATE_BATCH_RECORDS = 200_000
+TOKEN_PATTERN = re.compile(r'[0-9a-z]+')
+
+
+def tokenize(text):
+    '''소문자로 바꾼 영숫자 토큰 집합을 반환합니다.'''
+    return set(TOKEN_PATTERN.findall(text.lower()))
+
+
+def file_identity(stat):
+    '''파일 교체(로테이션)를 알아보기 위한 (장치, inode) 값.'''
+    return stat.st_dev, stat.st_ino
+
+
+def _timestamp_key(timestamp):
+    return timestamp.encode('utf-8')[:TIMESTAMP_WIDTH]
+
+
+def _offsets_bytes(offsets):
+    if not isinstance(offsets, array):
+        offsets = array('Q', offsets)
+    if sys.byteorder != 'little':
+        offsets = array('Q', offsets)
+        offsets.byteswap()
+    return offsets.tobytes()
+
+
+def _offsets_view(buffer):
+    '''uint64 배열 데이터를 복사 없이 읽습니다. (빅 엔디안 시스템에서는 바꿔서 복사)'''
+    if sys.byteorder == 'little':
+        return memoryview(buffer).cast('Q')
+    offsets = array('Q', bytes(buffer))
+    offsets.byteswap()
+    return offsets
+
+
+@contextlib.contextmanager
+def _mapped(path):
+    '''파일을 읽기 전용 mmap으로 엽니다. 없거나 비어 있으면 빈 bytes를 줍니다.'''
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        yield b''
+        return
+    with f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b''
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
+class _TimestampKeys:
+    '''time.bin의 한 run을 bisect로 찾을 수 있게 i번째 timestamp(bytes)를 돌려주는 시퀀스.'''
+
+    def __init__(self, times, start, end):
+        self.times = times
+        self.start = start
+        self.end = end
+
+    def __len__(self):
+        return self.end - self.start
+
+    def __getitem__(self, index):
+        position = (self.start + index) * TIME_RECORD.size
+        return bytes(self.times[position:position + TIMESTAMP_WIDTH]).rstrip(b'\0')
+
+
+class _Segment:
+    '''역색인 조각 파일 하나를 mmap으로 열어 토큰별 줄 위치를 읽습니다.'''
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, directory_size = SEGMENT_HEADER.unpack_from(self._mmap)
+        if magic != SEGMENT_MAGIC:
+            self._mmap.close()
+            raise ValueError(f'역색인 조각 파일이 아닙니다: {path}')
+        position = SEGMENT_HEADER.size
+        self.directory = json.loads(self._mmap[position:position + directory_size])
+        position += directory_size + (-directory_size % ALIGNMENT)
+        self._offsets = _offsets_view(memoryview(self._mmap)[position:])
+
+    def get(self, token):
+        start, count = self.directory.get(token, (0, 0))
+        return self._offsets[start:start + count]
+
+    def close(self):
+        if isinstance(self._offsets, memoryview):
+            self._offsets.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class LogStore:
+    '''
+    로그 파일과 그 색인 디렉터리를 함께 다루는 저장소.
+    마지막 저장 이후에 색인한 줄은 메모리에 모아 두었다가 save()에서 색인 파일 끝에 덧붙입니다.
+    '''
+
+    def __init__(self, log_path, index_path=None):
+        self.log_path = log_path
+        self.index_path = index_path or log_path + INDEX_SUFFIX
+        self._next_segment = 0
+        self.reset()
+        self._load_index()
+
+    def reset(self):
+        '''색인을 비웁니다. (로그 파일이 교체되거나 잘렸을 때) 디스크의 색인 파일은 다음 save()에서 정리됩니다.'''
+        self.file_id = None
+        self.indexed_size = 0
+        # 디스크에 저장된 시간 색인 레코드 수와, 그 안에서 각각 정렬된 구간 [start, end) 목록
+        self._count = 0
+        self._runs = []
+        # 역색인 조각 목록: {'name': 파일 이름, 'postings': 줄 위치 수}
+        self._segments = []
+        # 아직 저장하지 않은 (timestamp 키, 줄 위치)와 토큰 -> 줄 위치 목록
+        self._pending_times = []
+        self._pending_postings = {}
+
+    def _path(self, name):
+        return os.path.join(self.index_path, name)
+
+    def _load_index(self):
+        try:
+            with open(self._path(META_FILE), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (FileNotFoundError, NotADirectoryError, ValueError):
+            return
+        if meta.get('version') != INDEX_VERSION:
+            return
+        self.file_id = tuple(meta['file_id']) if meta['file_id'] else None
+        self.indexed_size = meta['indexed_size']
+        self._count = meta['count']
+        self._runs = [tuple(run) for run in meta['runs']]
+        self._segments = meta['segments']
+        self._next_segment = meta['next_segment']
+
+    def save(self):
+        '''
+        마지막 저장 이후에 추가된 레코드만 time.bin 끝에 덧붙이고 역색인 조각 하나를 새로 씁니다.
+        meta.json은 임시 파일에 쓴 뒤 교체하므로, 저장 도중 중단돼도 이전 저장 상태로 읽힙니다.
+        (meta.json에 기록되지 않은 time.bin 뒷부분과 조각 파일은 다음 저장 때 정리됩니다.)
+        '''
+        if os.path.isfile(self.index_path):
+            # 예전 형식(pickle 한 파일)의 색인
+            os.remove(self.index_path)
+        os.makedirs(self.index_path, exist_ok=True)
+
+        self._append_times()
+        if self._pending_postings:
+            self._segments.append(self._write_segment(self._pending_postings))
+            self._pending_postings = {}
+            self._merge_segments()
+
+        meta = {
+            'version': INDEX_VERSION,
+            'file_id': list(self.file_id) if self.file_id else None,
+            'indexed_size': self.indexed_size,
+            'count': self._count,
+            'runs': [list(run) for run in self._runs],
+            'segments': self._segments,
+            'next_segment': self._next_segment,
+        }
+        tmp_path = self._path(META_FILE + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self._path(META_FILE))
+
+        used = {segment['name'] for segment in self._segments}
+        for name in os.listdir(self.index_path):
+            if name.endswith(SEGMENT_SUFFIX) and name not in used:
+                os.remove(self._path(name))
+
+    def _append_times(self):
+        '''새 (timestamp, 줄 위치)를 정렬해서 time.bin 끝에 덧붙이고, 앞 run에 이어지면 그 run을 늘립니다.'''
+        path = self._path(TIME_FILE)
+        with open(path, 'r+b' if os.path.exists(path) else 'w+b') as f:
+            f.truncate(self._count * TIME_RECORD.size)
+            if not self._pending_times:
+                return
+            pending = sorted(self._pending_times)
+            self._pending_times = []
+
+            last_key = None
+            if self._runs and self._runs[-1][1] == self._count:
+                f.seek((self._count - 1) * TIME_RECORD.size)
+                last_key = TIME_RECORD.unpack(f.read(TIME_RECORD.size))[0].rstrip(b'\0')
+            f.seek(0, os.SEEK_END)
+            f.write(b''.join(TIME_RECORD.pack(key, offset) for key, offset in pending))
+
+        start, end = self._count, self._count + len(pending)
+        if last_key is not None and last_key <= pending[0][0]:
+            self._runs[-1] = (self._runs[-1][0], end)
+        else:
+            self._runs.append((start, end))
+        self._count = end
+        if len(self._runs) > MAX_TIME_RUNS:
+            self._compact_times()
+
+    def _compact_times(self):
+        '''여러 run을 하나로 합쳐 time.bin을 다시 씁니다. 순서가 어긋난 줄이 자주 들어올 때만 일어납니다.'''
+        path = self._path(TIME_FILE)
+        with _mapped(path) as times:
+            records = sorted(TIME_RECORD.iter_unpack(times[:self._count * TIME_RECORD.size]))
+        with open(path + '.tmp', 'wb') as f:
+            f.write(b''.join(TIME_RECORD.pack(*record) for record in records))
+        os.replace(path + '.tmp', path)
+        self._runs = [(0, self._count)]
+
+    def _write_segment(self, postings):
+        '''토큰 -> 줄 위치 목록을 조각 파일 하나로 쓰고 meta.json에 넣을 조각 정보를 반환합니다.'''
+        name = f'{self._next_segment:06d}{SEGMENT_SUFFIX}'
+        self._next_segment += 1
+        directory = {}
+        offsets = array('Q')
+        for token in sorted(postings):
+            directory[token] = [len(offsets), len(postings[token])]
+            offsets.extend(postings[token])
+        directory_data = json.dumps(directory, separators=(',', ':')).encode('utf-8')
+        with open(self._path(name), 'wb') as f:
+            f.write(SEGMENT_HEADER.pack(SEGMENT_MAGIC, len(directory_data)))
+            f.write(directory_data + b'\0' * (-len(directory_data) % ALIGNMENT))
+            f.write(_offsets_bytes(offsets))
+        return {'name': name, 'postings': len(offsets)}
+
+    def _merge_segments(self):
+        '''
+        마지막 조각이 바로 앞 조각보다 커지면 둘을 합칩니다. (이진 카운터 방식)
+        조각 수는 O(log 줄 수)로 유지되고, 줄 하나의 역색인은 평균 O(log n)번만 다시 쓰이므로
+        저장 비용은 지금까지의 전체 기록이 아니라 새로 추가된 양에 비례합니다.
+        '''
+        while len(self._segments) >= 2 and self._segments[-2]['postings'] <= self._segments[-1]['postings']:
+            postings = {}
+            # 뒤 조각의 줄 위치가 항상 더 크므로 앞 조각부터 이어 붙이면 정렬이 유지됩니다.
+            for segment in self._segments[-2:]:
+                with _Segment(self._path(segment['name'])) as reader:
+                    for token in reader.directory:
+                        view = reader.get(token)
+                        postings.setdefault(token, array('Q')).extend(view)
+                        if isinstance(view, memoryview):
+                            view.release()
+            self._segments[-2:] = [self._write_segment(postings)]
+
+    def add_record(self, offset, timestamp, event, message):
+        '''줄 하나를 시간 색인과 역색인에 추가합니다. (다음 save()에서 디스크에 덧붙음)'''
+        self._pending_times.append((_timestamp_key(timestamp), offset))
+        for token in tokenize(event) | tokenize(message):
+            self._pending_postings.setdefault(token, []).append(offset)
+
+    def ingest_line(self, offset, raw_line):
+        '''offset 위치에서 시작하는 줄(bytes) 하나를 파싱해서 색인에 추가하고, 레코드(또는 None)를 반환합니다.'''
+        record = parse_line(raw_line.decode('utf-8'))
+        if record is not None:
+            self.add_record(offset, *record)
+        return record
+
+    def check_identity(self, stat):
+        '''로그 파일이 다른 파일로 교체되었거나 색인한 크기보다 작아졌으면(잘림) 색인을 비웁니다.'''
+        file_id = file_identity(stat)
+        if file_id != self.file_id or stat.st_size < self.indexed_size:
+            self.reset()
+            self.file_id = file_id
+
+    def update(self):
+        '''
+        로그에서 아직 색인하지 않은 부분만 읽어 색인에 추가하고, 추가한 줄 수를 반환합니다.
+        파일이 다른 파일로 교체되었거나 색인한 크기보다 작아졌으면(잘림) 처음부터 다시 만듭니다.
+        끝이 줄바꿈으로 끝나지 않은 마지막 줄은 다음 update 때 색인합니다.
+        '''
+        stat = os.stat(self.log_path)
+        self.check_identity(stat)
+        if stat.st_size == self.indexed_size:
+            return 0
+
+        added = 0
+        with open(self.log_path, 'rb') as f:
+            f.seek(self.indexed_size)
+            offset = self.indexed_size
+            for raw_line in f:
+                if not raw_line.endswith(b'\n'):
+                    break
+                if self.ingest_line(offset, raw_line) is not None:
+                    added += 1
+                offset += len(raw_line)
+                if len(self._pending_times) >= UPDATE_BATCH_RECORDS:
+                    self.indexed_size = offset
+                    self.save()
+        self.indexed_size = offset
+        return added
+
+    def _read_record(self, f, offset):
+        f.seek(offset)
+        return parse_line(f.readline().decode('utf-8'))
+
+    def _time_bounds(self, times, start, end):
+        '''run마다 시간 구간 [start, end]에 드는 레코드 번호 구간 [low, high)를 반환합니다.'''
+        bounds = []
+        for run_start, run_end in self._runs:
+            keys = _TimestampKeys(times, run_start, run_end)
+            low = 0 if start is None else bisect.bisect_left(keys, _timestamp_key(start))
+            high = len(keys) if end is None else bisect.bisect_right(keys, _timestamp_key(end))
+            if low < high:
+                bounds.append((run_start + low, run_start + high))
+        return bounds
+
+    def _time_offsets(self, times, bounds, start, end):
+        offsets = [
+            TIME_RECORD.unpack_from(times, position * TIME_RECORD.size)[1]
+            for low, high in bounds for position in range(low, high)
+        ]
+        low_key = None if start is None else _timestamp_key(start)
+        high_key = None if end is None else _timestamp_key(end)
+        offsets.extend(
+            offset for key, offset in self._pending_times
+            if (low_key is None or key >= low_key) and (high_key is None or key <= high_key)
+        )
+        return offsets
+
+    def _keyword_offsets(self, keywords, match_all, count_only=False):
+        '''키워드에 맞는 줄 위치 집합을 반환합니다. count_only면 모으지 않고 역색인 항목 수의 합만 셉니다.'''
+        segments = [_Segment(self._path(segment['name'])) for segment in self._segments]
+        try:
+            if count_only:
+                tokens = set().union(*(tokenize(keyword) for keyword in keywords))
+                return sum(
+                    segment.directory.get(token, (0, 0))[1] for segment in segments for token in tokens
+                ) + sum(len(self._pending_postings.get(token, ())) for token in tokens)
+            offset_sets = []
+            for keyword in keywords:
+                offsets = set()
+                for token in tokenize(keyword):
+                    for segment in segments:
+                        view = segment.get(token)
+                        offsets.update(view)
+                        if isinstance(view, memoryview):
+                            view.release()
+                    offsets.update(self._pending_postings.get(token, ()))
+                offset_sets.append(offsets)
+        finally:
+            for segment in segments:
+                segment.close()
+        return set.intersection(*offset_sets) if match_all else set.union(*offset_sets)
+
+    def query(self, keywords=(), start=None, end=None, match_all=False):
+        '''
+        키워드(대소문자 무시)와 시간 구간 [start, end]로 레코드를 찾아 시간순 목록으로 반환합니다.
+        keywords가 여러 개면 기본은 하나라도 포함된 줄(OR), match_all=True면 모두 포함된 줄(AND)입니다.
+        시간 구간의 줄 수가 키워드의 역색인 항목 수보다 적으면 역색인 대신 구간의 줄만 읽어 키워드를 확인합니다.
+        '''
+        keyword_tokens = [tokenize(keyword) for keyword in keywords]
+        scan_range = False
+        with _mapped(self._path(TIME_FILE)) as times:
+            bounds = self._time_bounds(times, start, end)
+            if keywords and (start is not None or end is not None):
+                in_range = sum(high - low for low, high in bounds) + len(self._pending_times)
+                scan_range = in_range <= self._keyword_offsets(keywords, match_all, count_only=True)
+            if keywords and not scan_range:
+                candidates = self._keyword_offsets(keywords, match_all)
+            else:
+                candidates = self._time_offsets(times, bounds, start, end)
+
+        results = []
+        with open(self.log_path, 'rb') as f:
+            for offset in sorted(candidates):
+                record = self._read_record(f, offset)
+                if record is None:
+                    continue
+                timestamp, event, message = record
+                if start is not None and timestamp < start or end is not None and timestamp > end:
+                    continue
+                if scan_range:
+                    tokens = tokenize(event) | tokenize(message)
+                    hits = [not tokens.isdisjoint(wanted) for wanted in keyword_tokens]
+                    if not (all(hits) if match_all else any(hits)):
+                        continue
+                results.append(record)
+        results.sort(key=lambda record: record[0])
+        return results
+
+
+def open_store(log_path, index_path=None):
+    '''색인을 불러오고 로그에 새로 추가된 부분을 반영한 뒤 저장소를 반환합니다.'''
+    store = LogStore(log_path, index_path)
+    if store.update():
+        store.save()
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description='미션 컴퓨터 로그 색인 조회')
+    parser.add_argument('--log', default=os.path.join(SCRIPT_DIR, 'mission_computer_main.log'), help='로그 파일 경로')
+    parser.add_argument('--keyword', action='append', default=[], help='검색할 키워드 (여러 번 지정 가능)')
+    parser.add_argument('--all', action='store_true', help='모든 키워드를 포함한 줄만 찾습니다.')
+    parser.add_argument('--start', help="시작 시각 (예: '2023-08-27 11:00:00')")
+    parser.add_argument('--end', help="끝 시각 (예: '2023-08-27 12:00:00')")
+    args = parser.parse_args()
+
+    try:
+        store = open_store(args.log)
+    except FileNotFoundError:
+        print('로그 파일이 존재하지 않습니다.')
+        exit(1)
+    except PermissionError:
+        print('로그 파일에 접근 권한이 없습니다.')
+        exit(1)
+
+    for timestamp, event, message in store.query(args.keyword, args.start, args.end, args.all):
+        print(f'{timestamp}, {event}, {message}')
+
+
+if __name__ == '__main__':
+    main()
@@ -22,39 +22,315 @@ mission_computer_main.log의 내용을 통해서 사고의 원인을 분석하
 
 import os
 import json
+import time
+import argparse
+import signal
 
-# 현재 디렉터리 설정
-os.chdir(os.path.dirname(__file__))
-
-# 로그 파일 읽기
-try:
-    with open('mission_computer_main.log', 'r', encoding='utf-8') as f:
-        mars_logs = [line.strip() for line in f.readlines()]
-except FileNotFoundError:
-    print('로그 파일이 존재하지 않습니다.')
-    exit(1)
-except PermissionError:
-    print('로그 파일에 접근 권한이 없습니다.')
-    exit(1)
-
-# 로그 파싱 (timestamp, message만 추출)
-log_mars = []
-for line in mars_logs:
-    parts = line.split(',', 2)
-    if len(parts) == 3:
-        timestamp, event, message = parts
-        log_mars.append((timestamp.strip(), message.strip()))
-print (log_mars)
-# 시간 역순 출력
-for timestamp, message in reversed(log_mars):
-    print(f'{timestamp}, {message}')
-
-# 로그를 딕셔너리로 변환 후 JSON 저장
-log_dict = {timestamp: message for timestamp, message in log_mars}
-with open('mission_computer_main.json', 'w', encoding='utf-8') as f:
-    json.dump(log_dict, f, ensure_ascii=False, indent=4)
-
-# 로그에서 내용 검색
-for timestamp, message in log_dict.items():
-    if 'Oxygen' in message.lower():
-        print(f'{timestamp}: {message}')
\ No newline at end of file
+LOG_FILE = 'mission_computer_main.log'
+JSON_FILE = 'mission_computer_main.json'
+COLUMNAR_FILE = 'mission_computer_main.mlog'
+# 문제 상황으로 보고 따로 찾아볼 키워드
+SEARCH_KEYWORDS = ('oxygen', 'explosion')
+# 추적 모드에서 즉시 경고할 이상 징후 키워드 (소문자 토큰)
+ANOMALY_KEYWORDS = frozenset(('oxygen', 'explosion', 'unstable', 'leak', 'fire', 'failure', 'error', 'critical'))
+# 추적 모드에서 새 데이터를 확인하는 간격 / 색인에 새 줄을 덧붙여 저장하는 간격 (초)
+FOLLOW_INTERVAL = 0.5
+SAVE_INTERVAL = 5.0
+# 파일을 뒤에서부터 읽을 때 한 번에 읽는 크기 (바이트)
+READ_BLOCK_SIZE = 64 * 1024
+# 추적 모드가 JSON에 반영한 로그 위치를 기록하는 상태 파일 (JSON 파일 이름 뒤에 붙음)
+FOLLOW_STATE_SUFFIX = '.offset'
+
+
+def parse_line(line):
+    '''로그 한 줄을 (timestamp, event, message)로 나눕니다. 형식이 맞지 않거나 헤더 줄이면 None을 반환합니다.'''
+    parts = line.strip().split(',', 2)
+    if len(parts) != 3:
+        return None
+    timestamp, event, message = (part.strip() for part in parts)
+    if timestamp == 'timestamp':
+        return None
+    return timestamp, event, message
+
+
+def iter_logs(path):
+    '''로그 파일을 한 줄씩 읽으면서 (timestamp, event, message)를 내보냅니다. 파일 전체를 메모리에 올리지 않습니다.'''
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            record = parse_line(line)
+            if record is not None:
+                yield record
+
+
+def iter_lines_reverse(path, block_size=READ_BLOCK_SIZE):
+    '''파일 끝에서부터 block_size씩 거꾸로 읽으면서 줄을 마지막 줄부터 내보냅니다.'''
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        tail = b''
+        while position > 0:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            lines = (f.read(read_size) + tail).split(b'\n')
+            # 첫 조각은 앞 블록과 이어지는 줄일 수 있으므로 다음 블록으로 넘깁니다.
+            tail = lines[0]
+            for line in reversed(lines[1:]):
+                yield line.decode('utf-8')
+        if tail:
+            yield tail.decode('utf-8')
+
+
+def iter_logs_reverse(path, block_size=READ_BLOCK_SIZE):
+    '''로그를 시간의 역순(파일의 마지막 줄부터)으로 내보냅니다.'''
+    for line in iter_lines_reverse(path, block_size):
+        record = parse_line(line)
+        if record is not None:
+            yield record
+
+
+class JsonDictWriter:
+    '''
+    JSON 객체를 항목 단위로 바로 파일에 씁니다.
+    json.dump(..., indent=4)와 같은 모양이지만 딕셔너리를 메모리에 모으지 않습니다.
+    열자마자 닫는 괄호까지 써 두고 flush할 때마다 다시 써서, 파일은 flush 사이가 아니면 항상 올바른 JSON입니다.
+    resume_at을 주면 기존 파일에서 본문(닫는 괄호 앞) resume_at 바이트만 남기고 이어 씁니다.
+    '''
+
+    def __init__(self, path, resume_at=None):
+        if resume_at is None:
+            self.file = open(path, 'wb')
+            self.count = 0
+            self.file.write(b'{')
+        else:
+            self.file = self._resume(path, resume_at)
+            self.count = int(resume_at > 1)
+        self.flush()
+
+    @staticmethod
+    def _resume(path, size):
+        '''기존 JSON 파일을 앞 size 바이트까지 잘라 이어 쓸 수 있게 엽니다. 그 뒤의 닫는 괄호나 덜 쓰인 항목은 버립니다.'''
+        f = open(path, 'r+b')
+        if size < 1 or f.read(1) != b'{' or f.seek(0, os.SEEK_END) < size:
+            f.close()
+            raise ValueError(f'이어 쓸 수 없는 JSON 파일입니다: {path}')
+        f.seek(size)
+        f.truncate()
+        return f
+
+    def write(self, key, value):
+        separator = ',' if self.count else ''
+        key_text = json.dumps(key, ensure_ascii=False)
+        value_text = json.dumps(value, ensure_ascii=False)
+        self.file.write(f'{separator}\n    {key_text}: {value_text}'.encode('utf-8'))
+        self.count += 1
+
+    def flush(self):
+        '''
+        닫는 괄호까지 디스크에 써서 파일을 올바른 JSON 상태로 만든 뒤 다시 이어 쓸 위치로 돌아가고,
+        그 위치(닫는 괄호를 뺀 본문 크기)를 반환합니다. 다음 항목이 닫는 괄호 위에 덮어써지므로 파일을 잘라낼 필요가 없습니다.
+        '''
+        position = self.file.tell()
+        self.file.write(b'\n}' if self.count else b'}')
+        self.file.flush()
+        self.file.seek(position)
+        return position
+
+    def close(self):
+        self.file.write(b'\n}' if self.count else b'}')
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def load_follow_state(json_path):
+    '''추적 모드가 JSON에 어디까지 반영했는지 읽습니다. 반환값: (로그 위치, JSON 본문 크기, 로그 파일 식별값) 또는 None'''
+    try:
+        with open(json_path + FOLLOW_STATE_SUFFIX, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        return int(state['log_offset']), int(state['json_size']), tuple(state['file_id'])
+    except (FileNotFoundError, ValueError, KeyError, TypeError):
+        return None
+
+
+def save_follow_state(json_path, log_offset, json_size, file_id):
+    '''JSON 진행 상태를 임시 파일에 쓴 뒤 교체해서, 저장 도중 중단돼도 이전 상태가 남게 합니다.'''
+    state_path = json_path + FOLLOW_STATE_SUFFIX
+    with open(state_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump({'log_offset': log_offset, 'json_size': json_size, 'file_id': list(file_id)}, f)
+    os.replace(state_path + '.tmp', state_path)
+
+
+def remove_follow_state(json_path):
+    try:
+        os.remove(json_path + FOLLOW_STATE_SUFFIX)
+    except FileNotFoundError:
+        pass
+
+
+def _stop_on_sigterm(signum, frame):
+    raise KeyboardInterrupt
+
+
+def follow(log_path=LOG_FILE, json_path=JSON_FILE, interval=FOLLOW_INTERVAL):
+    '''
+    실행 중인 미션 컴퓨터의 로그를 tail -F처럼 따라가며 새로 추가된 바이트만 처리합니다.
+    새 줄은 색인과 JSON에 바로 반영하고, 이상 징후 키워드가 있으면 즉시 경고를 출력합니다.
+    로그 파일이 교체(로테이션)되거나 잘리면 처음부터 다시 읽습니다. Ctrl+C나 SIGTERM으로 종료합니다.
+
+    JSON에 반영한 위치는 색인과 따로 상태 파일(JSON 파일 이름 + .offset)에 기록합니다.
+    그래서 추적이 멈춘 동안 다른 실행이 색인을 갱신했더라도, 그 사이에 추가된 줄은 JSON과 경고에서 빠지지 않습니다.
+    상태 파일이 없거나 JSON이 깨져 있으면 로그 처음부터 JSON을 다시 만듭니다.
+    '''
+    from log_store import LogStore, file_identity, tokenize
+
+    f = open(log_path, 'rb')
+    stat = os.fstat(f.fileno())
+    file_id = file_identity(stat)
+    # 색인은 불러오기만 합니다. 아직 색인하지 않은 부분은 아래 루프에서 JSON 기록과 함께 색인합니다.
+    store = LogStore(log_path)
+    store.check_identity(stat)
+
+    writer = None
+    state = load_follow_state(json_path)
+    if state is not None:
+        log_offset, json_size, state_file_id = state
+        try:
+            writer = JsonDictWriter(json_path, resume_at=json_size)
+        except (FileNotFoundError, ValueError):
+            print('[알림] JSON 파일이 없거나 깨져서 로그 처음부터 다시 만듭니다.')
+        else:
+            if state_file_id != file_id or stat.st_size < log_offset:
+                # 멈춘 동안 로그가 교체되거나 잘렸으면 기존 기록은 두고 새 로그를 처음부터 이어 씁니다.
+                log_offset = 0
+            alert_from = log_offset
+    if writer is None:
+        writer = JsonDictWriter(json_path)
+        log_offset = 0
+        # 다시 만드는 경우 시작할 때 이미 있던 줄은 경고하지 않습니다.
+        alert_from = stat.st_size
+
+    line_start = min(log_offset, store.indexed_size)
+    f.seek(line_start)
+    pending = b''
+    dirty = False
+    last_save = time.time()
+    previous_handler = signal.signal(signal.SIGTERM, _stop_on_sigterm)
+    print(f'로그 추적 시작: {log_path} ({line_start:,} 바이트 이후부터, 종료: Ctrl+C)')
+
+    try:
+        while True:
+            chunk = f.read(READ_BLOCK_SIZE)
+            if chunk:
+                lines = (pending + chunk).split(b'\n')
+                pending = lines.pop()
+                for raw_line in lines:
+                    offset = line_start
+                    line_start += len(raw_line) + 1
+                    if offset >= store.indexed_size:
+                        record = store.ingest_line(offset, raw_line + b'\n')
+                    elif offset >= log_offset:
+                        record = parse_line(raw_line.decode('utf-8'))
+                    else:
+                        continue
+                    if record is None or offset < log_offset:
+                        continue
+                    timestamp, event, message = record
+                    writer.write(timestamp, message)
+                    if offset >= alert_from and tokenize(event + ' ' + message) & ANOMALY_KEYWORDS:
+                        print(f'[경고] {timestamp}, {event}, {message}')
+                store.indexed_size = max(store.indexed_size, line_start)
+                if line_start > log_offset:
+                    log_offset = line_start
+                    save_follow_state(json_path, log_offset, writer.flush(), file_id)
+                dirty = True
+                continue
+
+            if dirty and time.time() - last_save >= SAVE_INTERVAL:
+                store.save()
+                dirty = False
+                last_save = time.time()
+
+            # 새 데이터가 없으면 파일이 교체되었거나 잘렸는지 확인합니다.
+            try:
+                stat = os.stat(log_path)
+            except FileNotFoundError:
+                stat = None
+            if stat is not None and (file_identity(stat) != file_id or stat.st_size < line_start):
+                print('[알림] 로그 파일 교체/잘림을 감지해서 처음부터 다시 읽습니다.')
+                f.close()
+                f = open(log_path, 'rb')
+                stat = os.fstat(f.fileno())
+                file_id = file_identity(stat)
+                store.reset()
+                store.file_id = file_id
+                line_start = log_offset = alert_from = 0
+                pending = b''
+                save_follow_state(json_path, log_offset, writer.flush(), file_id)
+                continue
+
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print('\n로그 추적을 종료합니다.')
+    finally:
+        signal.signal(signal.SIGTERM, previous_handler)
+        f.close()
+        writer.close()
+        store.save()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='미션 컴퓨터 로그 분석')
+    parser.add_argument('--follow', action='store_true', help='로그 파일 끝을 계속 따라가며 새 줄만 처리합니다.')
+    parser.add_argument('--format', choices=('json', 'columnar'), default='json',
+                        help=f'파싱 결과 저장 형식 (columnar: 열 단위 이진 파일 {COLUMNAR_FILE})')
+    parser.add_argument('--interval', type=float, default=FOLLOW_INTERVAL, help='추적 모드에서 새 데이터를 확인하는 간격 (초)')
+    args = parser.parse_args()
+
+    # 현재 디렉터리 설정
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    try:
+        if args.follow:
+            follow(interval=args.interval)
+            return
+
+        # 시간 역순 출력 (파일 끝에서부터 블록 단위로 읽음)
+        for timestamp, event, message in iter_logs_reverse(LOG_FILE):
+            print(f'{timestamp}, {message}')
+
+        if args.format == 'columnar':
+            # 같은 시각의 레코드도 모두 남는 열 단위 이진 파일로 기록
+            from log_columnar import write_columnar
+            _, skipped = write_columnar(iter_logs(LOG_FILE), COLUMNAR_FILE)
+            if skipped:
+                print(f'시각 형식이 맞지 않아 건너뛴 레코드: {skipped:,}개')
+        else:
+            # 로그를 읽는 대로 JSON 파일에 기록 (새로 만드는 JSON이므로 추적 모드의 진행 상태는 버립니다)
+            remove_follow_state(JSON_FILE)
+            with JsonDictWriter(JSON_FILE) as writer:
+                for timestamp, event, message in iter_logs(LOG_FILE):
+                    writer.write(timestamp, message)
+
+        # 로그에서 내용 검색 (디스크 색인 사용, 대소문자 무시)
+        from log_store import open_store
+        store = open_store(LOG_FILE)
+        for timestamp, event, message in store.query(SEARCH_KEYWORDS):
+            print(f'{timestamp}: {message}')
+    except FileNotFoundError:
+        print('로그 파일이 존재하지 않습니다.')
+        exit(1)
+    except PermissionError:
+        print('로그 파일에 접근 권한이 없습니다.')
+        exit(1)
+    except ValueError as e:
+        print(f'오류: {e}')
+        exit(1)
+
+
+if __name__ == '__main__':
+    main()
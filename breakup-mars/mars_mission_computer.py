@@ -11,10 +11,43 @@ import termios
 import tty
 import select
 import os
+import asyncio
+import argparse
+import queue
 
-os.chdir(os.path.dirname(__file__))
+os.chdir(os.path.dirname(os.path.abspath(__file__)))
 stop_event = threading.Event()
 
+# 주기 작업별 기본 실행 간격 (초)
+DEFAULT_INTERVALS = {'info': 20, 'load': 20, 'sensor': 5}
+# 실행 간격을 이 비율 안에서 무작위로 흔들어 많은 인스턴스가 같은 순간에 몰리지 않게 합니다.
+DEFAULT_JITTER = 0.1
+# asyncio 스케줄러가 stop_event(스레드용)를 확인하는 간격 (초)
+STOP_POLL_INTERVAL = 0.2
+# CPU 사용률을 새로 재는 최소 간격 (초)
+CPU_SAMPLE_INTERVAL = 1.0
+# pool 모드에서 워커가 부모에게 통계를 보내는 간격 (초)
+METRICS_INTERVAL = 5.0
+_cpu_sample = {'time': None, 'value': 0.0}
+_cpu_sample_lock = threading.Lock()
+
+
+def sample_cpu_percent():
+    '''
+    기다리지 않고 CPU 사용률을 돌려줍니다. psutil.cpu_percent(interval=None)는 직전 호출 이후의 사용률이라
+    여러 인스턴스가 연달아 부르면 구간이 너무 짧아 값이 흔들리므로, CPU_SAMPLE_INTERVAL 안에서는 마지막 값을 씁니다.
+    '''
+    with _cpu_sample_lock:
+        now = time.monotonic()
+        if _cpu_sample['time'] is None:
+            # 첫 호출은 기준점만 잡습니다.
+            psutil.cpu_percent(interval=None)
+            _cpu_sample['time'] = now
+        elif now - _cpu_sample['time'] >= CPU_SAMPLE_INTERVAL:
+            _cpu_sample['value'] = psutil.cpu_percent(interval=None)
+            _cpu_sample['time'] = now
+        return _cpu_sample['value']
+
 def _sigint_handler(signum, frame):
     stop_event.set()
 
@@ -67,6 +100,7 @@ class MissionComputer:
             print(f"설정 로드 중 오류: {e}")
             self.settings = []
         self._init_computer_data()
+        sample_cpu_percent()
 
     def _load_settings(self, setting_file):
         with open(setting_file, 'r') as f:
@@ -79,28 +113,34 @@ class MissionComputer:
             'cpu_type': platform.processor,
             'cpu_cores': lambda: psutil.cpu_count(logical=False),
             'memory_total': lambda: f"{psutil.virtual_memory().total // (1024**2)} MB",
-            'cpu_usage': lambda: f"{psutil.cpu_percent(interval=1)} %",
+            'cpu_usage': lambda: f"{sample_cpu_percent()} %",
             'memory_usage': lambda: f"{psutil.virtual_memory().percent} %"
         }
 
-    def get_mission_computer_info_once(self):
+    def collect_info(self):
         keys = ['os', 'os_version', 'cpu_type', 'cpu_cores', 'memory_total']
-        result = {
+        return {
             k: (self.computer_data[k]() if callable(self.computer_data[k]) else self.computer_data[k])
             for k in keys
         }
-        print('[Info ]', json.dumps(result, indent=2))
 
-    def get_mission_computer_load_once(self):
+    def collect_load(self):
         keys = ['cpu_usage', 'memory_usage']
-        result = {k: self.computer_data[k]() for k in keys}
-        print('[Load ]', json.dumps(result, indent=2))
+        return {k: self.computer_data[k]() for k in keys}
+
+    def collect_sensor(self):
+        self.sensor.set_env()
+        return dict(self.sensor.get_env())
+
+    def get_mission_computer_info_once(self):
+        print('[Info ]', json.dumps(self.collect_info(), indent=2))
+
+    def get_mission_computer_load_once(self):
+        print('[Load ]', json.dumps(self.collect_load(), indent=2))
 
     def get_sensor_data(self):
         while not stop_event.is_set():
-            self.sensor.set_env()
-            vals = self.sensor.get_env()
-            print('[Sensor]', json.dumps(vals, indent=2))
+            print('[Sensor]', json.dumps(self.collect_sensor(), indent=2))
             time.sleep(5)
 
 def info_loop(mc: MissionComputer):
@@ -133,13 +173,177 @@ def start_mc(instance_id: int):
     for t in threads:
         t.join()
 
-if __name__ == '__main__':
-    # 'q' 키 감시 스레드 띄우기
-    threading.Thread(target=watch_q_key, daemon=True).start()
+class TelemetryScheduler:
+    '''
+    여러 MissionComputer의 주기 작업(info/load/sensor)을 스레드 없이 하나의 asyncio 이벤트 루프에서 실행합니다.
+    작업마다 첫 실행을 간격 안에서 무작위로 미루고(stagger) 매번 간격에 jitter를 더해 실행 시점을 흩어 놓습니다.
+    metrics에 작업별 실행 수, 오류 수, 예정 시각보다 늦어진 최대 시간(초)을 모읍니다.
+    '''
+
+    JOBS = {
+        'info': ('[Info ]', MissionComputer.collect_info),
+        'load': ('[Load ]', MissionComputer.collect_load),
+        'sensor': ('[Sensor]', MissionComputer.collect_sensor),
+    }
+
+    def __init__(self, intervals=None, jitter=DEFAULT_JITTER, echo=True, stop=stop_event):
+        self.intervals = dict(DEFAULT_INTERVALS, **(intervals or {}))
+        self.jitter = jitter
+        self.echo = echo
+        self.stop = stop
+        self.computers = []
+        self.metrics = {job: {'runs': 0, 'errors': 0, 'max_lag': 0.0} for job in self.JOBS}
+
+    def add(self, mc, name=None):
+        self.computers.append((name or f'MC-{len(self.computers) + 1}', mc))
+
+    def _next_delay(self, interval):
+        return interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+    async def _run_job(self, name, mc, job, stopped):
+        label, collect = self.JOBS[job]
+        interval = self.intervals[job]
+        metrics = self.metrics[job]
+        loop = asyncio.get_running_loop()
+        due = loop.time() + random.uniform(0, interval)
+        while not stopped.is_set():
+            try:
+                await asyncio.wait_for(stopped.wait(), max(0.0, due - loop.time()))
+                break
+            except asyncio.TimeoutError:
+                pass
+            metrics['max_lag'] = max(metrics['max_lag'], loop.time() - due)
+            try:
+                result = collect(mc)
+                metrics['runs'] += 1
+                if self.echo:
+                    print(label, name, json.dumps(result, indent=2))
+            except Exception as e:
+                metrics['errors'] += 1
+                print(f"{job} 에러 ({name}):", e)
+            due += self._next_delay(interval)
+
+    async def _watch_stop(self, stopped):
+        # stop_event는 스레드/프로세스용 Event이므로 짧은 간격으로 확인해 asyncio Event로 옮깁니다.
+        while not self.stop.is_set():
+            await asyncio.sleep(STOP_POLL_INTERVAL)
+        stopped.set()
+
+    async def run(self):
+        stopped = asyncio.Event()
+        watcher = asyncio.create_task(self._watch_stop(stopped))
+        jobs = [
+            self._run_job(name, mc, job, stopped)
+            for name, mc in self.computers
+            for job in self.JOBS
+            if self.intervals.get(job) is not None
+        ]
+        await asyncio.gather(*jobs)
+        watcher.cancel()
+        return self.metrics
+
+
+def run_async(count, intervals=None, jitter=DEFAULT_JITTER, echo=True):
+    '''count개의 MissionComputer를 하나의 이벤트 루프에서 실행하고 종료 시 작업별 통계를 반환합니다.'''
+    scheduler = TelemetryScheduler(intervals, jitter, echo)
+    for i in range(count):
+        scheduler.add(MissionComputer(DummySensor()), f'MC-{i + 1}')
+    return asyncio.run(scheduler.run())
+
+
+def merge_metrics(metrics_list):
+    '''워커별 작업 통계를 합칩니다. (실행·오류 수는 더하고, 지연은 가장 큰 값)'''
+    total = {job: {'runs': 0, 'errors': 0, 'max_lag': 0.0} for job in TelemetryScheduler.JOBS}
+    for metrics in metrics_list:
+        for job, values in metrics.items():
+            total[job]['runs'] += values['runs']
+            total[job]['errors'] += values['errors']
+            total[job]['max_lag'] = max(total[job]['max_lag'], values['max_lag'])
+    return total
 
-    # 3개 독립 프로세스 생성
+
+def fleet_worker(worker_id, instance_ids, intervals, jitter, echo, shared_stop, metrics_q):
+    '''
+    (pool 모드 워커 프로세스) 맡은 인스턴스들을 하나의 이벤트 루프에서 실행하고,
+    METRICS_INTERVAL마다, 그리고 끝날 때 작업 통계를 metrics_q로 부모에게 보냅니다.
+    Ctrl+C는 부모만 처리하고, 종료는 공유 이벤트 shared_stop으로 맞춥니다.
+    '''
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    scheduler = TelemetryScheduler(intervals, jitter, echo, stop=shared_stop)
+    for instance_id in instance_ids:
+        scheduler.add(MissionComputer(DummySensor()), f'MC-{instance_id}')
+
+    async def report():
+        while True:
+            await asyncio.sleep(METRICS_INTERVAL)
+            metrics_q.put(('metrics', worker_id, scheduler.metrics))
+
+    async def run():
+        reporter = asyncio.create_task(report())
+        try:
+            return await scheduler.run()
+        finally:
+            reporter.cancel()
+
+    metrics_q.put(('done', worker_id, asyncio.run(run())))
+
+
+def run_fleet(count, workers=None, intervals=None, jitter=DEFAULT_JITTER, echo=True):
+    '''
+    count개의 MissionComputer를 CPU 코어 수만큼의 워커 프로세스에 나눠 실행합니다. (워커 하나가 여러 인스턴스 담당)
+    stop_event(Ctrl+C, 'q')가 켜지면 공유 이벤트로 모든 워커를 함께 멈추고, 합친 작업 통계를 반환합니다.
+    '''
+    workers = max(1, min(workers or os.cpu_count() or 1, count))
+    shared_stop = multiprocessing.Event()
+    metrics_q = multiprocessing.Queue()
+    processes = []
+    for worker_id in range(workers):
+        # 인스턴스 번호를 워커마다 번갈아 나눠 줍니다. (1, 1+workers, ...)
+        instance_ids = list(range(worker_id + 1, count + 1, workers))
+        p = multiprocessing.Process(
+            target=fleet_worker,
+            args=(worker_id, instance_ids, intervals, jitter, echo, shared_stop, metrics_q),
+        )
+        p.start()
+        processes.append(p)
+    print(f"MissionComputer {count}개를 워커 프로세스 {workers}개에서 실행합니다. (종료: Ctrl+C 또는 q)")
+
+    latest = {}
+    finished = set()
+    last_report = time.monotonic()
+    while len(finished) < workers:
+        if stop_event.is_set():
+            shared_stop.set()
+        try:
+            kind, worker_id, metrics = metrics_q.get(timeout=STOP_POLL_INTERVAL)
+        except queue.Empty:
+            # 통계를 보내지 못하고 죽은 워커는 끝난 것으로 봅니다.
+            for worker_id, p in enumerate(processes):
+                if p.exitcode is not None and worker_id not in finished and metrics_q.empty():
+                    print(f"워커 {worker_id}가 비정상 종료되었습니다. (exit code {p.exitcode})")
+                    finished.add(worker_id)
+            continue
+        latest[worker_id] = metrics
+        if kind == 'done':
+            finished.add(worker_id)
+        elif time.monotonic() - last_report >= METRICS_INTERVAL:
+            # 워커마다 통계를 보내오지만 화면에는 간격마다 한 번만 합쳐서 출력합니다.
+            last_report = time.monotonic()
+            total = merge_metrics(latest.values())
+            summary = ', '.join(f"{job} {values['runs']}회" for job, values in total.items())
+            print(f"[Fleet] {summary}")
+
+    shared_stop.set()
+    for p in processes:
+        p.join()
+    print("모든 워커 프로세스가 종료되었습니다.")
+    return merge_metrics(latest.values())
+
+
+def run_processes(count):
+    '''MissionComputer마다 프로세스 하나(와 스레드 세 개)를 띄우는 기존 방식.'''
     processes = []
-    for i in (1, 2, 3):
+    for i in range(1, count + 1):
         p = multiprocessing.Process(target=start_mc, args=(i,))
         p.start()
         processes.append(p)
@@ -150,6 +354,36 @@ if __name__ == '__main__':
 
     print("모든 MissionComputer 프로세스가 종료되었습니다.")
 
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='MissionComputer 시뮬레이터')
+    parser.add_argument('--mode', choices=('process', 'async', 'pool'), default='process',
+                        help='process: 인스턴스마다 프로세스와 스레드, async: 하나의 이벤트 루프에서 모두 실행, '
+                             'pool: CPU 코어 수만큼의 워커 프로세스에 인스턴스를 나눠 실행')
+    parser.add_argument('--count', type=int, default=3, help='MissionComputer 인스턴스 수')
+    parser.add_argument('--workers', type=int, default=None, help='pool 모드 워커 프로세스 수 (기본값: CPU 코어 수)')
+    parser.add_argument('--info-interval', type=float, default=DEFAULT_INTERVALS['info'], help='info 작업 간격 (초)')
+    parser.add_argument('--load-interval', type=float, default=DEFAULT_INTERVALS['load'], help='load 작업 간격 (초)')
+    parser.add_argument('--sensor-interval', type=float, default=DEFAULT_INTERVALS['sensor'], help='sensor 작업 간격 (초)')
+    parser.add_argument('--jitter', type=float, default=DEFAULT_JITTER, help='간격을 무작위로 흔드는 비율 (0~1)')
+    parser.add_argument('--quiet', action='store_true', help='측정값을 출력하지 않고 종료 시 통계만 출력합니다.')
+    args = parser.parse_args()
+
+    # 'q' 키 감시 스레드 띄우기 (터미널에서 실행할 때만)
+    if sys.stdin.isatty():
+        threading.Thread(target=watch_q_key, daemon=True).start()
+
+    intervals = {'info': args.info_interval, 'load': args.load_interval, 'sensor': args.sensor_interval}
+    if args.mode == 'async':
+        metrics = run_async(args.count, intervals, args.jitter, not args.quiet)
+        print("모든 MissionComputer 작업이 종료되었습니다.")
+        print(json.dumps(metrics, indent=2))
+    elif args.mode == 'pool':
+        metrics = run_fleet(args.count, args.workers, intervals, args.jitter, not args.quiet)
+        print(json.dumps(metrics, indent=2))
+    else:
+        run_processes(args.count)
+
     '''
     
     '''
\ No newline at end of file
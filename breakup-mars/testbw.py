@@ -1,4 +1,11 @@
-import math
+import argparse
+import csv
+import functools
+import os
+import sys
+from collections import namedtuple
+
+import numpy as np
 
 material_result = ""
 diameter_result = 0
@@ -6,22 +13,155 @@ thickness_result = 1
 area_result = 0
 weight_result = 0
 
-material_density = {
-    "유리": 2.4,
-    "알루미늄": 2.7,
-    "탄소강": 7.85
+Material = namedtuple("Material", "name part density cost strength")
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+MATERIAL_FILE = os.path.join(SCRIPT_DIR, "materials.csv")
+PARTS_FILE = os.path.join(SCRIPT_DIR, "parts_to_work_on.csv")
+# 카탈로그 파일이 없을 때 쓰는 기본 재질 (밀도 g/cm³)
+DEFAULT_MATERIALS = {
+    "유리": Material("유리", "Glass", 2.4, 1.0, None),
+    "알루미늄": Material("알루미늄", "Aluminum", 2.7, 2.5, None),
+    "탄소강": Material("탄소강", "Steel", 7.85, 0.8, None),
 }
+DEFAULT_MATERIAL = "유리"
+# 화성 중력 (지구 중력 대비)
+MARS_GRAVITY_RATIO = 0.38
+BATCH_FIELDS = ("material", "diameter", "thickness")
+RESULT_FIELDS = ("material", "diameter", "thickness", "area", "mass", "weight", "cost")
+EVALUATION_CACHE_SIZE = 4096
+
+
+def load_materials(path=MATERIAL_FILE):
+    '''
+    재질 카탈로그 CSV(material,part,density,cost[,strength])를 {이름: Material}로 읽습니다.
+    cost는 kg당 상대 비용, strength가 비어 있으면 material_strength가 부품 강도 자료에서 찾습니다.
+    파일이 없으면 기본 재질을 씁니다.
+    '''
+    try:
+        f = open(path, "r", encoding="utf-8-sig", newline="")
+    except FileNotFoundError:
+        return dict(DEFAULT_MATERIALS)
+    materials = {}
+    with f:
+        for row in csv.DictReader(f):
+            try:
+                strength = row.get("strength") or ""
+                material = Material(row["material"].strip(), (row.get("part") or "").strip(),
+                                    float(row["density"]), float(row.get("cost") or 0),
+                                    float(strength) if strength.strip() else None)
+            except (KeyError, TypeError, ValueError):
+                raise ValueError(f"재질 카탈로그 형식이 올바르지 않습니다: {row}") from None
+            materials[material.name] = material
+    return materials
+
+
+materials = load_materials()
+material_density = {name: material.density for name, material in materials.items()}
+
+
+def reload_materials(path=MATERIAL_FILE):
+    '''카탈로그를 다시 읽고, 이전 재질 값으로 계산해 둔 캐시를 비웁니다.'''
+    global materials
+    materials = load_materials(path)
+    material_density.clear()
+    material_density.update((name, material.density) for name, material in materials.items())
+    evaluate_design.cache_clear()
+    material_strength.cache_clear()
+
+
+def check_materials(names):
+    '''카탈로그에 없는 재질이 있으면 ValueError를 냅니다. (예전처럼 유리로 조용히 바꾸지 않습니다)'''
+    unknown = sorted(set(names) - set(materials))
+    if unknown:
+        raise ValueError(f"알 수 없는 재질: {', '.join(unknown)} (가능: {', '.join(materials)})")
+
+
+@functools.lru_cache(maxsize=None)
+def material_strength(name):
+    '''
+    재질의 강도. 카탈로그에 값이 없으면 대응하는 부품(part)의 평균 강도를
+    parts_to_work_on.csv에서, 거기에도 없으면 design_dome으로 question5 자료를 집계해서 찾습니다.
+    '''
+    check_materials([name])
+    material = materials[name]
+    if material.strength is not None or not material.part:
+        return material.strength
+    try:
+        with open(PARTS_FILE, "r", encoding="utf-8-sig", newline="") as f:
+            for row in csv.DictReader(f):
+                if row.get("part") == material.part:
+                    return float(row["avg_strength"])
+    except FileNotFoundError:
+        pass
+
+    import glob
+    import design_dome
+    paths = glob.glob(os.path.join(SCRIPT_DIR, design_dome.INPUT_PATTERN))
+    if not paths:
+        return None
+    parts, stats = design_dome.aggregate_shards(paths, ("mean",), processes=1)
+    matches = np.flatnonzero(parts == material.part)
+    return float(stats["mean"][matches[0]]) if len(matches) else None
+
+
+def material_values(names, field):
+    '''
+    재질 이름(하나 또는 배열)을 카탈로그의 field 값(density, cost) 배열로 바꿉니다.
+    재질 종류는 몇 개뿐이므로 np.unique로 정렬하는 것보다 종류별로 한 번씩 비교하는 편이 빠릅니다.
+    '''
+    names = np.asarray(names)
+    if names.ndim == 0:
+        check_materials([names.item()])
+        return np.float64(getattr(materials[names.item()], field))
+    values = np.full(names.shape, np.nan)
+    for name, material in materials.items():
+        values[names == name] = getattr(material, field)
+    if np.isnan(values).any():
+        check_materials(np.unique(names[np.isnan(values)]).tolist())
+    return values
+
+
+def material_densities(names):
+    '''재질 이름(하나 또는 배열)을 밀도(g/cm³) 배열로 바꿉니다.'''
+    return material_values(names, "density")
+
+
+def evaluate_domes(diameters, material_names=DEFAULT_MATERIAL, thicknesses=1):
+    '''
+    반구 돔 여러 개를 한 번에 계산합니다. 인자는 숫자/문자열 하나 또는 배열이며 NumPy 방식으로 브로드캐스트됩니다.
+    지름은 m, 두께는 cm 단위이고, 반올림하지 않은 배열을 담은 dict를 반환합니다.
+        area: 겉넓이 (m²), mass: 질량 (kg), weight: 화성에서의 무게 (kg), cost: 재료비 (kg당 상대 비용 x 질량)
+    카탈로그에 없는 재질이 있으면 ValueError를 냅니다.
+    '''
+    diameters = np.asarray(diameters, dtype=np.float64)
+    thicknesses = np.asarray(thicknesses, dtype=np.float64)
+    radius = diameters / 2
+    area = 2 * np.pi * radius ** 2
+    volume_cm3 = area * (thicknesses / 100) * 1_000_000
+    mass_kg = (volume_cm3 * material_densities(material_names)) / 1000
+    return {
+        "area": area,
+        "mass": mass_kg,
+        "weight": mass_kg * MARS_GRAVITY_RATIO,
+        "cost": mass_kg * material_values(material_names, "cost"),
+    }
+
+
+@functools.lru_cache(maxsize=EVALUATION_CACHE_SIZE)
+def evaluate_design(material, diameter, thickness=1):
+    '''
+    설계 하나를 계산해 (면적, 질량, 화성 무게, 재료비)를 반환합니다.
+    (재질, 지름, 두께)별로 결과를 기억해 두어 같은 설계를 다시 물으면 계산하지 않습니다.
+    '''
+    result = evaluate_domes(diameter, material, thickness)
+    return tuple(float(result[field]) for field in ("area", "mass", "weight", "cost"))
+
 
 def sphere_area(diameter, material="유리", thickness=1):
     global material_result, diameter_result, thickness_result, area_result, weight_result
 
-    radius = diameter / 2
-    area = 2 * math.pi * radius ** 2
-    volume_cm3 = area * (thickness / 100) * 1_000_000
-
-    density = material_density.get(material, material_density["유리"])
-    mass_kg = (volume_cm3 * density) / 1000
-    weight_kg = mass_kg * 0.38
+    area, _, weight_kg, _ = evaluate_design(material, diameter, thickness)
 
     area = round(area, 3)
     weight_kg = round(weight_kg, 3)
@@ -33,20 +173,95 @@ def sphere_area(diameter, material="유리", thickness=1):
     weight_result = weight_kg
 
 
-while True:
-    material = input("재질을 입력하세요 종료하려면 -1을 입력해주세요 (유리/알루미늄/탄소강): ").strip()
-    if material not in material_density:
-        if material=='-1':
-            break
-        print("잘못된 재질입니다. 유리, 알루미늄, 탄소강 중에서 선택해주세요.")
-        continue
-    try:
-        diameter = float(input("지름을 입력하세요 (m): "))
-        if diameter < 0:
-            print("자연수 값을 입력해주세요.")
+def read_batch(f):
+    '''
+    material,diameter[,thickness] 형식의 CSV를 (재질 배열, 지름 배열, 두께 배열)로 읽습니다.
+    첫 줄이 헤더(material,...)면 건너뛰고, 두께가 없으면 1cm로 봅니다.
+    '''
+    names, diameters, thicknesses = [], [], []
+    for line_number, row in enumerate(csv.reader(f), 1):
+        if not row or row[0].strip().lstrip('\ufeff') == BATCH_FIELDS[0]:
+            continue
+        try:
+            diameter = float(row[1])
+            thickness = float(row[2]) if len(row) > 2 and row[2].strip() else 1.0
+        except (IndexError, ValueError):
+            raise ValueError(f"{line_number}번째 줄 형식이 올바르지 않습니다: {','.join(row)}") from None
+        if diameter < 0 or thickness < 0:
+            raise ValueError(f"{line_number}번째 줄: 지름과 두께는 0 이상이어야 합니다.")
+        names.append(row[0].strip())
+        diameters.append(diameter)
+        thicknesses.append(thickness)
+    check_materials(names)
+    return np.array(names, dtype=str), np.array(diameters), np.array(thicknesses)
+
+
+def write_results(f, material_names, diameters, thicknesses, results):
+    writer = csv.writer(f, lineterminator='\n')
+    writer.writerow(RESULT_FIELDS)
+    columns = tuple(results[field].round(3) for field in RESULT_FIELDS[3:])
+    writer.writerows(zip(material_names.tolist(), diameters.tolist(), thicknesses.tolist(), *(c.tolist() for c in columns)))
+
+
+def run_batch(input_path, output_path=None):
+    '''CSV 파일(또는 '-'이면 표준 입력)의 설계들을 한 번에 계산해 CSV로 출력합니다.'''
+    if input_path == '-':
+        material_names, diameters, thicknesses = read_batch(sys.stdin)
+    else:
+        with open(input_path, 'r', encoding='utf-8', newline='') as f:
+            material_names, diameters, thicknesses = read_batch(f)
+
+    results = evaluate_domes(diameters, material_names, thicknesses)
+    if output_path is None:
+        write_results(sys.stdout, material_names, diameters, thicknesses, results)
+    else:
+        with open(output_path, 'w', encoding='utf-8', newline='') as f:
+            write_results(f, material_names, diameters, thicknesses, results)
+        print(f"{len(material_names)}개 설계의 계산 결과를 '{output_path}' 파일에 저장했습니다.")
+
+
+def main():
+    names = "/".join(materials)
+    while True:
+        material = input(f"재질을 입력하세요 종료하려면 -1을 입력해주세요 ({names}): ").strip()
+        if material not in material_density:
+            if material=='-1':
+                break
+            print(f"잘못된 재질입니다. {', '.join(materials)} 중에서 선택해주세요.")
             continue
-        sphere_area(diameter, material)
-        print(f"재질 ⇒ {material_result}, 지름 ⇒ {diameter_result}, 두께 ⇒ {thickness_result}, 면적 ⇒ {area_result}, 무게 ⇒ {weight_result} kg")
-    except ValueError:
-        print("지름은 숫자 형식으로 입력해야 합니다.")
-print('종료되었습니다')
\ No newline at end of file
+        try:
+            diameter = float(input("지름을 입력하세요 (m): "))
+            if diameter < 0:
+                print("자연수 값을 입력해주세요.")
+                continue
+            sphere_area(diameter, material)
+            print(f"재질 ⇒ {material_result}, 지름 ⇒ {diameter_result}, 두께 ⇒ {thickness_result}, 면적 ⇒ {area_result}, 무게 ⇒ {weight_result} kg")
+        except ValueError:
+            print("지름은 숫자 형식으로 입력해야 합니다.")
+    print('종료되었습니다')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='반구 돔 면적/무게 계산')
+    parser.add_argument('--batch', metavar='CSV',
+                        help="material,diameter[,thickness] CSV를 한 번에 계산합니다. ('-'면 표준 입력)")
+    parser.add_argument('--output', help='--batch 결과 CSV 파일 경로 (없으면 화면에 출력)')
+    parser.add_argument('--materials', action='store_true', help='재질 카탈로그(밀도, 비용, 강도)를 출력합니다.')
+    args = parser.parse_args()
+
+    if args.materials:
+        for material in materials.values():
+            strength = material_strength(material.name)
+            print(f"{material.name} ({material.part or '-'}): 밀도 {material.density} g/cm³, "
+                  f"kg당 비용 {material.cost}, 강도 {'알 수 없음' if strength is None else round(strength, 2)}")
+    elif args.batch:
+        try:
+            run_batch(args.batch, args.output)
+        except FileNotFoundError:
+            print('입력 파일이 존재하지 않습니다.')
+            exit(1)
+        except ValueError as e:
+            print(f'오류: {e}')
+            exit(1)
+    else:
+        main()
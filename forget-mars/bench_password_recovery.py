@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# bench_password_recovery.py
+#
+# door_hacking.py(ZIP 암호 해독)와 password.py(카이사르 해독)의 성능을 측정하는 벤치마크.
+# 알려진 암호로 테스트 ZIP을 만들어 같은 조건에서 반복 측정하고, 결과를 JSON으로 남겨
+# 변경 전후의 성능 저하를 비교할 수 있게 합니다.
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import random
+import string
+import struct
+import sys
+import tempfile
+import time
+import zlib
+from unittest import mock
+
+import door_hacking
+import password
+
+# 결과가 매번 같도록 고정한 난수 시드
+SEED = 20250827
+DEFAULT_LENGTHS = (3, 4)
+DEFAULT_CAESAR_SIZES = (10_000, 100_000, 1_000_000)
+DEFAULT_WORKER_CANDIDATES = 500_000
+ZIP_MEMBER_NAME = 'password.txt'
+ZIP_MEMBER_DATA = b'mars base emergency key\n'
+
+
+def make_encrypted_zip(path: str, zip_password: str, data: bytes = ZIP_MEMBER_DATA, seed: int = SEED):
+    """
+    ZipCrypto로 암호화된(저장 방식, 압축 없음) ZIP 파일을 만듭니다.
+    zipfile 모듈은 암호화된 ZIP을 쓸 수 없으므로 헤더를 직접 구성합니다.
+    """
+    keys = door_hacking.ZipCryptoVerifier._init_keys(zip_password.encode('utf-8'))
+    crc = zlib.crc32(data)
+    rng = random.Random(seed)
+    # 암호화 헤더: 11바이트 난수 + CRC 상위 바이트(체크 바이트)
+    plain = bytes(rng.randrange(256) for _ in range(11)) + bytes([crc >> 24]) + data
+
+    encrypted = bytearray()
+    for byte in plain:
+        encrypted.append(byte ^ door_hacking.KEYSTREAM_TABLE[keys[2] & 0xFFFF])
+        keys = door_hacking.ZipCryptoVerifier._init_keys(bytes([byte]), keys)
+
+    name = ZIP_MEMBER_NAME.encode('utf-8')
+    local_header = struct.pack(
+        door_hacking.LOCAL_HEADER_FORMAT, door_hacking.LOCAL_HEADER_SIGNATURE, 20,
+        door_hacking.FLAG_ENCRYPTED, 0, 0, 0, crc, len(encrypted), len(data), len(name), 0
+    ) + name
+    central_header = struct.pack(
+        '<4sHHHHHHIIIHHHHHII', b'PK\x01\x02', 20, 20, door_hacking.FLAG_ENCRYPTED, 0, 0, 0,
+        crc, len(encrypted), len(data), len(name), 0, 0, 0, 0, 0, 0
+    ) + name
+    end_record = struct.pack(
+        '<4sHHHHIIH', b'PK\x05\x06', 0, 0, 1, 1, len(central_header),
+        len(local_header) + len(encrypted), 0
+    )
+
+    with open(path, 'wb') as f:
+        f.write(local_header + encrypted + central_header + end_record)
+
+
+def bench_generation(count: int) -> dict:
+    """후보 생성 속도 (generate_password vs iter_password_blocks)."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return door_hacking.benchmark_generation(count)
+
+
+def bench_worker(zip_path: str, count: int) -> dict:
+    """
+    door_hacking.worker 하나를 현재 프로세스에서 실행해 프로세스당 처리 속도를 잽니다.
+    암호가 범위에 없도록 만든 ZIP을 써서 count개를 모두 시도하게 합니다.
+    """
+    source = door_hacking.MaskSource.brute_force()
+    tasks = [(0, count)]
+    next_task = multiprocessing.Value('q', 0)
+    found_rank = multiprocessing.Value('q', door_hacking.NOT_FOUND)
+    result_q = multiprocessing.Queue()
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        door_hacking.worker(0, zip_path, tasks, source, next_task, found_rank, result_q, time.time())
+    elapsed = time.perf_counter() - start
+
+    return {
+        'candidates': count,
+        'seconds': round(elapsed, 4),
+        'candidates_per_sec': round(count / elapsed),
+        'verifier': 'numpy' if door_hacking.np is not None else 'python',
+    }
+
+
+def bench_unlock(work_dir: str, lengths, max_processes: int) -> list:
+    """
+    암호 길이별 테스트 ZIP을 만들어 unlock_zip을 1..max_processes개 프로세스로 실행합니다.
+    time_to_hit_seconds는 프로세스 시작과 정리까지 포함한 전체 시간이고, 처리 속도는 워커들이
+    progress 메시지로 보고한 실제 시도 횟수를 마지막 보고 시각으로 나눠 계산합니다.
+    """
+    rng = random.Random(SEED)
+    charset = door_hacking.CHARSET
+    results = []
+
+    for length in lengths:
+        total = len(charset) ** length
+        # 키 공간의 뒤쪽 절반에 있는 암호를 골라 충분한 양을 탐색하게 합니다.
+        index = rng.randrange(total // 2, total)
+        zip_password = door_hacking.generate_password(index, charset, length)
+        zip_path = os.path.join(work_dir, f'bench_len{length}.zip')
+        make_encrypted_zip(zip_path, zip_password)
+
+        for process_count in range(1, max_processes + 1):
+            chunk_size = max(10_000, total // (process_count * 16))
+            stats = {}
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                found = door_hacking.unlock_zip(
+                    zip_path=zip_path, process_count=process_count, chunk_size=chunk_size,
+                    report_interval=0, charset=charset, password_length=length, password_file=None,
+                    stats=stats
+                )
+            elapsed = time.perf_counter() - start
+            # 워커의 보고 시각은 unlock_zip 시작 기준이므로, 가장 늦은 보고가 탐색이 끝난 시점입니다.
+            search_seconds = max((t for _, t in stats['workers'].values()), default=0.0)
+
+            results.append({
+                'password_length': length,
+                'password_index': index,
+                'processes': process_count,
+                'chunk_size': chunk_size,
+                'found': found == zip_password,
+                'time_to_hit_seconds': round(elapsed, 4),
+                'candidates_tried': stats['attempts'],
+                'candidates_per_sec': round(stats['attempts'] / search_seconds) if search_seconds > 0 else 0,
+            })
+    return results
+
+
+def bench_caesar(sizes) -> list:
+    """password.caesar_cipher_decode를 큰 입력으로 실행합니다. (출력은 버리고 입력은 1번으로 고정)"""
+    rng = random.Random(SEED)
+    alphabet = string.ascii_letters + ' '
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        result_file = os.path.join(tmp_dir, 'result.txt')
+        for size in sizes:
+            text = ''.join(rng.choice(alphabet) for _ in range(size))
+            start = time.perf_counter()
+            with mock.patch('builtins.input', return_value='1'), \
+                    mock.patch.object(password, 'RESULT_FILE', result_file), \
+                    contextlib.redirect_stdout(io.StringIO()):
+                password.caesar_cipher_decode(text)
+            elapsed = time.perf_counter() - start
+
+            results.append({
+                'chars': size,
+                'seconds': round(elapsed, 4),
+                'chars_per_sec': round(size * 26 / elapsed),
+            })
+    return results
+
+
+def run_benchmarks(lengths=DEFAULT_LENGTHS, max_processes: int = None, caesar_sizes=DEFAULT_CAESAR_SIZES,
+                   generation_count: int = 1_000_000, worker_candidates: int = DEFAULT_WORKER_CANDIDATES) -> dict:
+    """모든 벤치마크를 실행하고 결과를 dict로 반환합니다."""
+    if max_processes is None:
+        max_processes = multiprocessing.cpu_count()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        # 후보 범위 밖(마지막 인덱스)의 암호로 만든 ZIP: 워커가 모든 후보를 시도하게 됩니다.
+        miss_zip = os.path.join(work_dir, 'bench_miss.zip')
+        make_encrypted_zip(miss_zip, door_hacking.generate_password(len(door_hacking.CHARSET) ** 6 - 1))
+
+        return {
+            'meta': {
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'python': sys.version.split()[0],
+                'platform': platform.platform(),
+                'cpu_count': multiprocessing.cpu_count(),
+                'numpy': door_hacking.np is not None,
+                'seed': SEED,
+            },
+            'generation': bench_generation(generation_count),
+            'worker': bench_worker(miss_zip, worker_candidates),
+            'unlock_zip': bench_unlock(work_dir, lengths, max_processes),
+            'caesar': bench_caesar(caesar_sizes),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='암호 해독 파이프라인 벤치마크')
+    parser.add_argument('--lengths', type=int, nargs='+', default=list(DEFAULT_LENGTHS), help='테스트 ZIP 암호 길이 목록')
+    parser.add_argument('--max-processes', type=int, default=None, help='unlock_zip 최대 프로세스 수 (기본값: CPU 코어 수)')
+    parser.add_argument('--caesar-sizes', type=int, nargs='+', default=list(DEFAULT_CAESAR_SIZES),
+                        help='카이사르 해독 입력 길이 목록 (문자 수)')
+    parser.add_argument('--output', help='결과 JSON 파일 경로 (없으면 화면에 출력)')
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.lengths, args.max_processes, args.caesar_sizes)
+    text = json.dumps(results, ensure_ascii=False, indent=2)
+
+    if args.output:
+        try:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                f.write(text + '\n')
+            print(f"벤치마크 결과를 '{args.output}' 파일에 저장했습니다.")
+        except IOError as e:
+            print(f"오류: 결과 파일 저장에 실패했습니다 - {e}")
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
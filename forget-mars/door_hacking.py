@@ -7,124 +7,930 @@ import string
 import multiprocessing
 import os
 import zlib
+import argparse
+import struct
+import queue
+import json
+import mmap
+
+try:
+    import numpy as np
+except ImportError:  # numpy가 없으면 순수 파이썬 검사기를 사용합니다.
+    np = None
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 ZIP_PATH = os.path.join(SCRIPT_DIR, 'emergency_storage_key.zip')
 PASSWORD_FILE = os.path.join(SCRIPT_DIR, 'password.txt')
+CHECKPOINT_FILE = os.path.join(SCRIPT_DIR, 'door_hacking_checkpoint.json')
 
 CHARSET = string.digits + string.ascii_lowercase
 PASSWORD_LENGTH = 6
+# 워커가 취소 여부를 확인하는 단위 (후보 개수)
+BLOCK_SIZE = 10_000
+# 워커가 공유 카운터에서 한 번에 가져가는 작업 단위 (후보 개수)
+CHUNK_SIZE = 1_000_000
+# 진행 상황 출력 주기 (초)
+REPORT_INTERVAL = 10.0
+# 체크포인트 파일 저장 주기 (초)
+CHECKPOINT_INTERVAL = 30.0
+# 아직 암호를 찾지 못했음을 나타내는 청크 순위
+NOT_FOUND = 2 ** 62
+# 사용자 중단(Ctrl+C) 시 모든 워커를 멈추게 하는 청크 순위
+CANCELLED = -1
+
+def _build_next_char_table(charset_bytes: bytes) -> bytes:
+    """각 문자 바이트 다음 순서의 문자 바이트를 담은 256바이트 테이블을 만듭니다. (마지막 문자는 첫 문자로 돌아감)"""
+    table = bytearray(256)
+    for i, ch in enumerate(charset_bytes):
+        table[ch] = charset_bytes[(i + 1) % len(charset_bytes)]
+    return bytes(table)
+
+# hashcat 마스크 기호별 문자 집합
+MASK_CHARSETS = {
+    'l': string.ascii_lowercase,
+    'u': string.ascii_uppercase,
+    'd': string.digits,
+    'h': string.digits + 'abcdef',
+    'H': string.digits + 'ABCDEF',
+    's': ' ' + string.punctuation,
+    'a': string.ascii_lowercase + string.ascii_uppercase + string.digits + ' ' + string.punctuation,
+    '?': '?',
+}
+# 인자가 없는 규칙 연산
+SIMPLE_RULES = {
+    'l': bytes.lower,
+    'u': bytes.upper,
+    'c': bytes.capitalize,
+    't': bytes.swapcase,
+    'r': lambda w: w[::-1],
+    'd': lambda w: w + w,
+    '[': lambda w: w[1:],
+    ']': lambda w: w[:-1],
+}
+
+# ZipCrypto 관련 상수
+LOCAL_HEADER_FORMAT = '<4sHHHHHIIIHH'
+LOCAL_HEADER_SIZE = struct.calcsize(LOCAL_HEADER_FORMAT)
+LOCAL_HEADER_SIGNATURE = b'PK\x03\x04'
+ENCRYPTION_HEADER_SIZE = 12
+FLAG_ENCRYPTED = 0x01
+FLAG_DATA_DESCRIPTOR = 0x08
+FLAG_STRONG_ENCRYPTION = 0x40
+
+def _build_crc_table() -> list:
+    """ZipCrypto 키 갱신에 쓰는 CRC-32 테이블을 만듭니다."""
+    table = []
+    for i in range(256):
+        crc = i
+        for _ in range(8):
+            if crc & 1:
+                crc = (crc >> 1) ^ 0xEDB88320
+            else:
+                crc >>= 1
+        table.append(crc)
+    return table
+
+CRC_TABLE = _build_crc_table()
+# key2의 하위 16비트만으로 결정되는 복호화 키 스트림 바이트
+KEYSTREAM_TABLE = bytes((((i | 2) * ((i | 2) ^ 1)) >> 8) & 0xFF for i in range(0x10000))
+if np is not None:
+    CRC_ARRAY = np.array(CRC_TABLE, dtype=np.uint32)
+    KEYSTREAM_ARRAY = np.frombuffer(KEYSTREAM_TABLE, dtype=np.uint8)
 
-def generate_password(index: int) -> str:
-    """정수 인덱스를 기반으로 6자리 비밀번호를 생성합니다."""
-    base = len(CHARSET)
+def generate_password(index: int, charset: str = CHARSET, password_length: int = PASSWORD_LENGTH) -> str:
+    """정수 인덱스를 기반으로 password_length자리(기본 6자리) 비밀번호를 생성합니다."""
+    base = len(charset)
     password_chars = []
     
     temp_index = index
-    for _ in range(PASSWORD_LENGTH):
+    for _ in range(password_length):
         temp_index, remainder = divmod(temp_index, base)
-        password_chars.append(CHARSET[remainder])
+        password_chars.append(charset[remainder])
     
     return "".join(reversed(password_chars))
 
-def worker(start_idx: int, end_idx: int, found_flag: multiprocessing.Value, result_q: multiprocessing.Queue, start_time: float):
+def iter_password_blocks(start_idx: int, end_idx: int, block_size: int = BLOCK_SIZE,
+                         charset: str = CHARSET, password_length: int = PASSWORD_LENGTH):
+    """
+    [start_idx, end_idx) 범위의 후보 암호를 bytes 리스트 블록 단위로 생성합니다.
+    모든 자리가 같은 문자 집합을 쓰는 마스크로 보고 iter_mask_blocks에 맡깁니다.
+    """
+    yield from iter_mask_blocks([charset] * password_length, start_idx, end_idx, block_size)
+
+def mask_candidate(index: int, charsets: list) -> str:
+    """자리별 문자 집합(charsets)에서 정수 인덱스에 해당하는 후보를 만듭니다. (generate_password와 같은 순서)"""
+    chars = []
+    for charset in reversed(charsets):
+        index, remainder = divmod(index, len(charset))
+        chars.append(charset[remainder])
+    return "".join(reversed(chars))
+
+def iter_mask_blocks(charsets: list, start_idx: int, end_idx: int, block_size: int = BLOCK_SIZE):
+    """
+    자리별 문자 집합(charsets)으로 정의된 후보 공간의 [start_idx, end_idx) 범위를 bytes 리스트 블록 단위로 생성합니다.
+    인덱스마다 divmod로 후보를 새로 만드는 대신, 시작 위치만 mask_candidate로 구하고
+    이후에는 재사용하는 bytearray 버퍼를 주행거리계처럼 올림(carry)하며 증가시킵니다.
+    마지막 자리는 미리 인코딩해 둔 문자 목록을 붙여 한 번에 확장하므로
+    후보 하나당 bytes 객체 하나만 새로 만들어집니다.
+    """
+    if start_idx >= end_idx:
+        return
+
+    encoded = [charset.encode('ascii') for charset in charsets]
+    next_char_tables = [_build_next_char_table(charset_bytes) for charset_bytes in encoded[:-1]]
+    first_chars = [charset_bytes[0] for charset_bytes in encoded[:-1]]
+    base = len(encoded[-1])
+    last_chars = [bytes((ch,)) for ch in encoded[-1]]
+
+    # 마지막 자리를 제외한 앞부분 버퍼
+    prefix = bytearray(mask_candidate(start_idx, charsets).encode('ascii')[:-1])
+    offset = start_idx % base
+    idx = start_idx
+    block = []
+
+    while idx < end_idx:
+        count = min(base - offset, end_idx - idx)
+        head = bytes(prefix)
+        block.extend([head + ch for ch in last_chars[offset:offset + count]])
+        idx += count
+        offset = 0
+
+        # 앞부분 버퍼를 1 증가 (뒤에서부터 올림 처리)
+        pos = len(prefix) - 1
+        while pos >= 0:
+            next_char = next_char_tables[pos][prefix[pos]]
+            prefix[pos] = next_char
+            if next_char != first_chars[pos]:
+                break
+            pos -= 1
+
+        if len(block) >= block_size:
+            yield block
+            block = []
+
+    if block:
+        yield block
+
+def parse_mask(mask: str) -> list:
+    """
+    hashcat 형식의 마스크(예: '?d?d?l?l?l?l')를 자리별 문자 집합 목록으로 바꿉니다.
+    ?l ?u ?d ?h ?H ?s ?a 와 '??'(물음표 문자)를 지원하고, 나머지 문자는 그 자리에 고정됩니다.
+    """
+    charsets = []
+    pos = 0
+    while pos < len(mask):
+        ch = mask[pos]
+        if ch == '?':
+            if pos + 1 >= len(mask) or mask[pos + 1] not in MASK_CHARSETS:
+                raise ValueError(f"알 수 없는 마스크 기호입니다: '{mask[pos:pos + 2]}'")
+            charsets.append(MASK_CHARSETS[mask[pos + 1]])
+            pos += 2
+        else:
+            if not ch.isascii():
+                raise ValueError(f"마스크에는 ASCII 문자만 쓸 수 있습니다: '{ch}'")
+            charsets.append(ch)
+            pos += 1
+    if not charsets:
+        raise ValueError('마스크가 비어 있습니다.')
+    return charsets
+
+def compile_rule(rule: str) -> list:
+    """
+    hashcat 형식 규칙 문자열(예: 'c$1$2')을 바이트 변환 함수 목록으로 컴파일합니다.
+    지원: ':'(그대로) l u c t r d '[' ']' $X ^X sXY
+    """
+    ops = []
+    pos = 0
+    while pos < len(rule):
+        op = rule[pos]
+        if op in ' :':
+            pos += 1
+        elif op in SIMPLE_RULES:
+            ops.append(SIMPLE_RULES[op])
+            pos += 1
+        elif op in '$^' and pos + 1 < len(rule):
+            arg = rule[pos + 1].encode('utf-8')
+            ops.append((lambda w, a=arg: w + a) if op == '$' else (lambda w, a=arg: a + w))
+            pos += 2
+        elif op == 's' and pos + 2 < len(rule):
+            old, new = rule[pos + 1].encode('utf-8'), rule[pos + 2].encode('utf-8')
+            ops.append(lambda w, o=old, n=new: w.replace(o, n))
+            pos += 3
+        else:
+            raise ValueError(f"알 수 없는 규칙입니다: '{rule}'")
+    return ops
+
+def load_rules(path: str) -> list:
+    """규칙 파일을 읽습니다. 빈 줄과 '#'으로 시작하는 줄은 건너뜁니다."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+
+class MaskSource:
+    """
+    자리별 문자 집합으로 정의되는 후보 공간. 전수 조사도 모든 자리가 같은 마스크로 표현됩니다.
+    모든 후보 소스는 total(인덱스 공간 크기), name, iter_blocks(start, end)를 제공하므로
+    같은 워커 풀/체크포인트/샤딩을 그대로 사용합니다.
+    """
+
+    def __init__(self, charsets: list, name: str):
+        self.charsets = charsets
+        self.name = name
+        self.total = 1
+        for charset in charsets:
+            self.total *= len(charset)
+
+    @classmethod
+    def from_mask(cls, mask: str):
+        return cls(parse_mask(mask), f'mask:{mask}')
+
+    @classmethod
+    def brute_force(cls, charset: str = CHARSET, password_length: int = PASSWORD_LENGTH):
+        return cls([charset] * password_length, f'brute:{password_length}:{charset}')
+
+    def iter_blocks(self, start_idx: int, end_idx: int, block_size: int = BLOCK_SIZE):
+        return iter_mask_blocks(self.charsets, start_idx, end_idx, block_size)
+
+class WordlistSource:
+    """
+    단어 목록 파일을 메모리 맵으로 열어 줄 단위로 흘려 읽는 후보 소스.
+    인덱스 공간은 파일의 바이트 오프셋이고, 각 단어는 시작 바이트가 속한 구간에서 한 번만 나옵니다.
+    rules가 주어지면 단어마다 규칙을 적용한 변형들을 후보로 냅니다.
+    """
+
+    def __init__(self, path: str, rules: list = None):
+        self.path = os.path.abspath(path)
+        self.rules = list(rules) if rules else [':']
+        self.total = os.path.getsize(self.path)
+        self.name = f"wordlist:{self.path}:{self.total}:{'|'.join(self.rules)}"
+        # 잘못된 규칙은 워커를 띄우기 전에 알립니다.
+        for rule in self.rules:
+            compile_rule(rule)
+
+    def iter_blocks(self, start_idx: int, end_idx: int, block_size: int = BLOCK_SIZE):
+        if start_idx >= end_idx or self.total == 0:
+            return
+
+        # 람다 목록은 피클링할 수 없으므로 워커 안에서 컴파일합니다.
+        compiled = [compile_rule(rule) for rule in self.rules]
+        with open(self.path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            size = len(mm)
+            pos = start_idx
+            # 구간 시작이 줄 중간이면 그 줄은 앞 구간의 몫이므로 건너뜁니다.
+            if pos > 0 and mm[pos - 1] != 0x0A:
+                newline = mm.find(b'\n', pos)
+                pos = size if newline < 0 else newline + 1
+
+            block = []
+            while pos < end_idx and pos < size:
+                newline = mm.find(b'\n', pos)
+                line_end = size if newline < 0 else newline
+                word = mm[pos:line_end].rstrip(b'\r')
+                pos = line_end + 1
+                if not word:
+                    continue
+
+                seen = set()
+                for ops in compiled:
+                    candidate = word
+                    for op in ops:
+                        candidate = op(candidate)
+                    if candidate and candidate not in seen:
+                        seen.add(candidate)
+                        block.append(candidate)
+
+                if len(block) >= block_size:
+                    yield block
+                    block = []
+
+            if block:
+                yield block
+
+def benchmark_generation(count: int = 1_000_000):
+    """generate_password와 iter_password_blocks의 초당 후보 생성 수를 비교합니다."""
+    start = time.perf_counter()
+    for idx in range(count):
+        generate_password(idx).encode('utf-8')
+    legacy_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    generated = 0
+    for block in iter_password_blocks(0, count):
+        for _ in block:
+            generated += 1
+    block_elapsed = time.perf_counter() - start
+
+    legacy_rate = count / legacy_elapsed
+    block_rate = generated / block_elapsed
+    print("--- 후보 생성 벤치마크 ---")
+    print(f"후보 수: {count:,}개")
+    print(f"generate_password     : {legacy_rate:,.0f}개/초 ({legacy_elapsed:.2f}초)")
+    print(f"iter_password_blocks  : {block_rate:,.0f}개/초 ({block_elapsed:.2f}초)")
+    print(f"속도 향상: {block_rate / legacy_rate:.1f}배")
+    return {'count': count, 'legacy_rate': legacy_rate, 'block_rate': block_rate}
+
+class ZipCryptoVerifier:
+    """
+    ZIP 멤버의 로컬 파일 헤더를 한 번만 파싱해서 12바이트 암호화 헤더를 메모리에 들고 있고,
+    ZipCrypto 키 스케줄과 체크 바이트만으로 틀린 암호를 빠르게 걸러냅니다.
+    체크 바이트가 맞는 후보(약 1/256)만 ZipFile.read로 전체 복호화 + CRC 검사를 하면 됩니다.
+    """
+
+    def __init__(self, zip_path: str, member: str):
+        with zipfile.ZipFile(zip_path) as zf:
+            info = zf.getinfo(member)
+
+        if not info.flag_bits & FLAG_ENCRYPTED:
+            raise ValueError(f"'{member}'은(는) 암호화되어 있지 않습니다.")
+        if info.flag_bits & FLAG_STRONG_ENCRYPTION:
+            raise ValueError(f"'{member}'은(는) ZipCrypto가 아닌 방식으로 암호화되어 있습니다.")
+
+        with open(zip_path, 'rb') as f:
+            f.seek(info.header_offset)
+            header = f.read(LOCAL_HEADER_SIZE)
+            (signature, _, flags, _, mod_time, _, _, _, _,
+             name_length, extra_length) = struct.unpack(LOCAL_HEADER_FORMAT, header)
+            if signature != LOCAL_HEADER_SIGNATURE:
+                raise zipfile.BadZipFile('로컬 파일 헤더 시그니처가 올바르지 않습니다.')
+            f.seek(name_length + extra_length, os.SEEK_CUR)
+            self.encryption_header = f.read(ENCRYPTION_HEADER_SIZE)
+
+        if len(self.encryption_header) != ENCRYPTION_HEADER_SIZE:
+            raise zipfile.BadZipFile('암호화 헤더가 잘려 있습니다.')
+
+        # 데이터 디스크립터를 쓰는 경우 CRC 대신 수정 시각의 상위 바이트가 체크 바이트가 됩니다.
+        if flags & FLAG_DATA_DESCRIPTOR:
+            self.check_byte = (mod_time >> 8) & 0xFF
+        else:
+            self.check_byte = (info.CRC >> 24) & 0xFF
+
+        self._cached_prefix = None
+        self._cached_keys = None
+
+    @staticmethod
+    def _init_keys(password: bytes, keys: tuple = (0x12345678, 0x23456789, 0x34567890)) -> tuple:
+        """암호 바이트로 ZipCrypto의 세 키를 갱신합니다."""
+        crc_table = CRC_TABLE
+        key0, key1, key2 = keys
+        for ch in password:
+            key0 = (key0 >> 8) ^ crc_table[(key0 ^ ch) & 0xFF]
+            key1 = ((key1 + (key0 & 0xFF)) * 134775813 + 1) & 0xFFFFFFFF
+            key2 = (key2 >> 8) ^ crc_table[(key2 ^ (key1 >> 24)) & 0xFF]
+        return key0, key1, key2
+
+    def check(self, password: bytes) -> bool:
+        """암호화 헤더의 체크 바이트가 맞으면 True를 반환합니다. (False면 확실히 틀린 암호)"""
+        return bool(self.filter([password]))
+
+    def filter(self, passwords) -> list:
+        """체크 바이트 검사를 통과한 후보만 골라 리스트로 반환합니다. (numpy가 있으면 블록 전체를 벡터 연산)"""
+        if np is None:
+            return self._filter_python(passwords)
+
+        by_length = {}
+        for password in passwords:
+            by_length.setdefault(len(password), []).append(password)
+        if len(by_length) == 1:
+            return self._filter_numpy(passwords)
+
+        # 길이가 섞인 블록(사전 공격 등)은 길이별로 나눠 검사한 뒤 원래 순서를 유지합니다.
+        survivors = set()
+        for group in by_length.values():
+            survivors.update(self._filter_numpy(group))
+        return [password for password in passwords if password in survivors]
+
+    def _filter_numpy(self, passwords: list) -> list:
+        """길이가 같은 후보들의 세 키를 uint32 배열로 한꺼번에 갱신해서 검사합니다."""
+        if not passwords:
+            return []
+        length = len(passwords[0])
+        count = len(passwords)
+        chars = np.frombuffer(b''.join(passwords), dtype=np.uint8).reshape(count, length)
+
+        crc_array = CRC_ARRAY
+        key0 = np.full(count, 0x12345678, dtype=np.uint32)
+        key1 = np.full(count, 0x23456789, dtype=np.uint32)
+        key2 = np.full(count, 0x34567890, dtype=np.uint32)
+        multiplier = np.uint32(134775813)
+        one = np.uint32(1)
+
+        def update_keys(column):
+            nonlocal key0, key1, key2
+            key0 = (key0 >> 8) ^ crc_array[(key0 ^ column) & 0xFF]
+            key1 = (key1 + (key0 & 0xFF)) * multiplier + one
+            key2 = (key2 >> 8) ^ crc_array[(key2 ^ (key1 >> 24)) & 0xFF]
+
+        for pos in range(length):
+            update_keys(chars[:, pos])
+
+        plain = None
+        for ch in self.encryption_header:
+            plain = KEYSTREAM_ARRAY[key2 & 0xFFFF] ^ np.uint8(ch)
+            update_keys(plain)
+
+        return [passwords[i] for i in np.flatnonzero(plain == self.check_byte)]
+
+    def _filter_python(self, passwords) -> list:
+        """
+        numpy가 없을 때 사용하는 순수 파이썬 검사기입니다.
+        블록 단위로 호출해서 메서드 호출과 속성 조회 비용을 후보마다 치르지 않도록 합니다.
+        """
+        crc_table = CRC_TABLE
+        keystream = KEYSTREAM_TABLE
+        encryption_header = self.encryption_header
+        check_byte = self.check_byte
+        init_keys = self._init_keys
+        cached_prefix = self._cached_prefix
+        cached_keys = self._cached_keys
+        survivors = []
+
+        for password in passwords:
+            # 같은 블록의 후보들은 마지막 글자만 다르므로 앞부분까지의 키 상태를 재사용합니다.
+            prefix = password[:-1]
+            if prefix != cached_prefix:
+                cached_prefix = prefix
+                cached_keys = init_keys(prefix)
+            key0, key1, key2 = cached_keys
+            if password:
+                key0 = (key0 >> 8) ^ crc_table[(key0 ^ password[-1]) & 0xFF]
+                key1 = ((key1 + (key0 & 0xFF)) * 134775813 + 1) & 0xFFFFFFFF
+                key2 = (key2 >> 8) ^ crc_table[(key2 ^ (key1 >> 24)) & 0xFF]
+
+            plain = 0
+            for ch in encryption_header:
+                plain = ch ^ keystream[key2 & 0xFFFF]
+                key0 = (key0 >> 8) ^ crc_table[(key0 ^ plain) & 0xFF]
+                key1 = ((key1 + (key0 & 0xFF)) * 134775813 + 1) & 0xFFFFFFFF
+                key2 = (key2 >> 8) ^ crc_table[(key2 ^ (key1 >> 24)) & 0xFF]
+            if plain == check_byte:
+                survivors.append(password)
+
+        self._cached_prefix = cached_prefix
+        self._cached_keys = cached_keys
+        return survivors
+
+def try_passwords(zip_file: zipfile.ZipFile, member: str, passwords, verifier: ZipCryptoVerifier = None) -> tuple:
+    """
+    후보 암호 블록을 차례로 시도합니다.
+    verifier가 주어지면 체크 바이트 검사를 통과한 후보만 전체 복호화 + CRC 검사를 합니다.
+    (찾은 암호 문자열 또는 None, 시도한 횟수)를 반환합니다.
+    """
+    candidates = passwords if verifier is None else verifier.filter(passwords)
+
+    for password in candidates:
+        try:
+            zip_file.read(member, pwd=password)
+        except (RuntimeError, zlib.error, zipfile.BadZipFile):
+            continue
+        except Exception as e:
+            print(f"[Worker {os.getpid()}] 암호 시도 중 예외 발생: {e}")
+            continue
+        return password.decode('utf-8', errors='replace'), passwords.index(password) + 1
+    return None, len(passwords)
+
+def make_verifier(zip_path: str, member: str):
+    """ZipCrypto 검사기를 만들고, 지원하지 않는 형식이면 None을 반환합니다. (ZipFile.read로만 검사)"""
+    try:
+        return ZipCryptoVerifier(zip_path, member)
+    except ValueError as e:
+        print(f"[Worker {os.getpid()}] 체크 바이트 검사를 사용하지 않습니다 - {e}")
+        return None
+
+def zip_target(zip_path: str) -> dict:
+    """
+    체크포인트가 어떤 ZIP을 대상으로 한 것인지 가려내는 값.
+    절대 경로, 파일 크기와 수정 시각, 공격 대상 멤버(첫 번째 파일)의 이름, CRC, 로컬 헤더 위치를 씁니다.
+    """
+    with zipfile.ZipFile(zip_path) as zf:
+        info = zf.infolist()[0]
+    stat = os.stat(zip_path)
+    return {
+        'path': os.path.abspath(zip_path),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'member': info.filename,
+        'crc': info.CRC,
+        'header_offset': info.header_offset,
+    }
+
+
+class Checkpoint:
+    """
+    탐색을 끝낸 인덱스 구간 [start, end) 목록을 기록하는 체크포인트 파일.
+    구간 단위로 저장하므로 청크 크기를 바꾸거나 다른 노드에서 이어서 실행해도 그대로 쓸 수 있습니다.
+    target(zip_target 값)도 함께 기록해서, 다른 ZIP의 완료 구간을 건너뛰는 일이 없게 합니다.
+    """
+
+    def __init__(self, path: str, source_name: str = None, target: dict = None):
+        self.path = path
+        self.source_name = source_name or MaskSource.brute_force().name
+        self.target = target
+        self.ranges = []
+
+    @classmethod
+    def load(cls, path: str, source_name: str = None, target: dict = None):
+        """체크포인트 파일을 읽습니다. 파일이 없으면 빈 체크포인트를 반환합니다."""
+        checkpoint = cls(path, source_name, target)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return checkpoint
+
+        if data.get('source') != checkpoint.source_name:
+            raise ValueError(f"체크포인트 '{path}'의 후보 소스({data.get('source')})가 현재 설정과 다릅니다.")
+        if data.get('target') != checkpoint.target:
+            saved_path = (data.get('target') or {}).get('path', '알 수 없음')
+            raise ValueError(f"체크포인트 '{path}'는 다른 ZIP 파일({saved_path})을 대상으로 한 것입니다.")
+        for start, end in data.get('completed', []):
+            checkpoint.add(start, end)
+        return checkpoint
+
+    def add(self, start: int, end: int):
+        """완료한 구간을 추가하고, 맞닿거나 겹치는 구간은 하나로 합칩니다."""
+        merged = []
+        for cur_start, cur_end in sorted(self.ranges + [(start, end)]):
+            if merged and cur_start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], cur_end))
+            else:
+                merged.append((cur_start, cur_end))
+        self.ranges = merged
+
+    def covers(self, start: int, end: int) -> bool:
+        """[start, end) 구간 전체가 이미 완료되었는지 확인합니다."""
+        return any(cur_start <= start and end <= cur_end for cur_start, cur_end in self.ranges)
+
+    def completed_count(self) -> int:
+        return sum(end - start for start, end in self.ranges)
+
+    def save(self):
+        """임시 파일에 쓴 뒤 os.replace로 교체해서, 저장 도중 중단돼도 파일이 깨지지 않게 합니다."""
+        data = {
+            'source': self.source_name,
+            'target': self.target,
+            'completed': [list(r) for r in self.ranges],
+        }
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+def _is_cancelled(found_rank: multiprocessing.Value, rank: int, deterministic: bool) -> bool:
+    """
+    현재 청크(rank)를 그만 탐색해도 되는지 확인합니다.
+    결정적 모드에서는 우선순위가 더 높은(앞선) 청크에서 암호가 발견됐을 때만 중단합니다.
+    """
+    if deterministic:
+        return found_rank.value < rank
+    return found_rank.value != NOT_FOUND
+
+def worker(worker_id: int, zip_path: str, tasks: list, source,
+           next_task: multiprocessing.Value, found_rank: multiprocessing.Value,
+           result_q: multiprocessing.Queue, start_time: float, deterministic: bool = False):
     """
     각 프로세스가 실행할 작업 함수.
-    주어진 범위 내의 인덱스를 암호로 변환하여 암호 풀기를 시도합니다.
+    공유 카운터(next_task)로 tasks의 다음 청크 (start, end)를 하나씩 가져와 암호 풀기를 시도하고,
+    청크를 끝낼 때마다 진행 상황을 result_q로 보고하고, 끝날 때는 어떤 경우든 'exit' 메시지를 보냅니다.
     """
     try:
-        zip_file = zipfile.ZipFile(ZIP_PATH)
+        _open_and_run(worker_id, zip_path, tasks, source, next_task, found_rank,
+                      result_q, start_time, deterministic)
+    finally:
+        # 같은 프로세스가 보낸 메시지는 순서대로 도착하므로, 부모는 'exit'를 받으면 이 워커의 보고를 모두 받은 것입니다.
+        result_q.put(('exit', worker_id))
+
+def _open_and_run(worker_id, zip_path, tasks, source, next_task, found_rank,
+                  result_q, start_time, deterministic):
+    """ZIP 파일을 열고 청크 탐색 루프를 실행합니다."""
+    try:
+        zip_file = zipfile.ZipFile(zip_path)
         first_file_in_zip = zip_file.namelist()[0]
+        verifier = make_verifier(zip_path, first_file_in_zip)
     except FileNotFoundError:
-        print(f"[Worker {os.getpid()}] 오류: ZIP 파일 '{ZIP_PATH}'을(를) 찾을 수 없습니다.")
+        print(f"[Worker {worker_id}] 오류: ZIP 파일 '{zip_path}'을(를) 찾을 수 없습니다.")
         return
     except Exception as e:
-        print(f"[Worker {os.getpid()}] 오류: ZIP 파일을 여는 중 문제 발생 - {e}")
+        print(f"[Worker {worker_id}] 오류: ZIP 파일을 여는 중 문제 발생 - {e}")
         return
 
+    try:
+        _run_chunks(worker_id, zip_file, first_file_in_zip, verifier, tasks, source,
+                    next_task, found_rank, result_q, start_time, deterministic)
+    except KeyboardInterrupt:
+        # Ctrl+C는 부모 프로세스가 처리하고 체크포인트를 저장합니다.
+        pass
+    finally:
+        zip_file.close()
+
+def _run_chunks(worker_id, zip_file, first_file_in_zip, verifier, tasks, source,
+                next_task, found_rank, result_q, start_time, deterministic):
+    """공유 카운터에서 청크를 가져와 탐색하는 워커의 본체 루프."""
     attempts_in_worker = 0
-    for idx in range(start_idx, end_idx):
-        if idx % 1000 == 0:
-            if found_flag.value:
+    while True:
+        with next_task.get_lock():
+            rank = next_task.value
+            next_task.value += 1
+        if rank >= len(tasks) or _is_cancelled(found_rank, rank, deterministic):
+            break
+
+        start_idx, end_idx = tasks[rank]
+
+        password = None
+        completed = True
+        for block in source.iter_blocks(start_idx, end_idx):
+            if _is_cancelled(found_rank, rank, deterministic):
+                completed = False
                 break
 
-        password = generate_password(idx)
-        attempts_in_worker += 1
+            password, tried = try_passwords(zip_file, first_file_in_zip, block, verifier)
+            attempts_in_worker += tried
+            if password is not None:
+                break
 
-        try:
-            zip_file.read(first_file_in_zip, pwd=password.encode('utf-8'))
-            
-            with found_flag.get_lock():
-                found_flag.value = True
-            result_q.put(password)
-            
-            elapsed_time = time.time() - start_time
-            print(f"\n[Worker {os.getpid()}] 암호 발견! 시도 횟수: {attempts_in_worker}회, 진행 시간: {elapsed_time:.2f}초")
-            break
-            
-        except (RuntimeError, zlib.error, zipfile.BadZipFile):
-            continue
-        except Exception as e:
-            print(f"[Worker {os.getpid()}] 암호 시도 중 예외 발생: {e}")
-            continue
-            
-    zip_file.close()
+        elapsed_time = time.time() - start_time
+        result_q.put(('progress', worker_id, attempts_in_worker, elapsed_time))
+        if completed and password is None:
+            result_q.put(('done', worker_id, start_idx, end_idx))
+
+        if password is not None:
+            with found_rank.get_lock():
+                if rank < found_rank.value:
+                    found_rank.value = rank
+            result_q.put(('found', worker_id, rank, password))
+            print(f"\n[Worker {worker_id}] 암호 발견! 시도 횟수: {attempts_in_worker}회, 진행 시간: {elapsed_time:.2f}초")
+            if not deterministic:
+                break
+
+def _print_progress(worker_stats: dict, completed: int, range_size: int, elapsed_time: float):
+    """워커별 시도 횟수와 처리 속도를 한 번에 출력합니다."""
+    total_attempts = sum(attempts for attempts, _ in worker_stats.values())
+    percent = completed / range_size * 100 if range_size else 100.0
+    print(f"[진행] {elapsed_time:.0f}초 경과, 총 {total_attempts:,}개 시도 ({percent:.2f}%)")
+    for worker_id in sorted(worker_stats):
+        attempts, worker_elapsed = worker_stats[worker_id]
+        rate = attempts / worker_elapsed if worker_elapsed > 0 else 0.0
+        print(f"    워커 {worker_id}: {attempts:,}개, {rate:,.0f}개/초")
+
+def shard_range(shard_index: int, shard_count: int, total_passwords: int) -> tuple:
+    """키 공간을 shard_count개로 나눴을 때 shard_index번째 조각의 인덱스 구간 [start, end)를 반환합니다."""
+    if not 0 <= shard_index < shard_count:
+        raise ValueError(f"샤드 번호는 0 이상 {shard_count} 미만이어야 합니다: {shard_index}")
+    start = total_passwords * shard_index // shard_count
+    end = total_passwords * (shard_index + 1) // shard_count
+    return start, end
 
-def unlock_zip():
+def unlock_zip(zip_path: str = ZIP_PATH, process_count: int = None, chunk_size: int = CHUNK_SIZE,
+               chunk_order: list = None, deterministic: bool = False, report_interval: float = REPORT_INTERVAL,
+               checkpoint: Checkpoint = None, checkpoint_interval: float = CHECKPOINT_INTERVAL,
+               charset: str = CHARSET, password_length: int = PASSWORD_LENGTH, shard: tuple = (0, 1),
+               source=None, password_file: str = PASSWORD_FILE, stats: dict = None):
+    """
+    키 공간을 chunk_size 크기의 청크로 나누고, 워커들이 공유 카운터에서 청크를 하나씩 가져가게 합니다.
+    shard=(i, N)이면 키 공간을 N개로 나눈 i번째 구간만 탐색하므로, N대의 호스트가 서로 겹치지 않게 나눠 맡을 수 있습니다.
+    chunk_order로 (샤드 구간 안의) 청크 탐색 순서(우선순위)를 지정할 수 있고, deterministic이 True면
+    워커 수와 관계없이 우선순위상 가장 앞선 암호를 결과로 돌려줍니다.
+    checkpoint가 주어지면 이미 완료된 청크는 건너뛰고, 완료한 구간을 주기적으로 저장합니다.
+    source로 후보 소스(MaskSource, WordlistSource)를 지정하며, 없으면 charset/password_length 전수 조사를 합니다.
+    찾은 암호는 password_file에 저장합니다. (None이면 저장하지 않음)
+    stats에 dict를 넘기면 워커별 (시도 횟수, 마지막 보고 시각)을 'workers'에, 총 시도 횟수를 'attempts'에 채웁니다.
+    찾은 암호를 반환하고, 찾지 못하면 None을 반환합니다.
+    """
     start_time = time.time()
-    total_passwords = len(CHARSET) ** PASSWORD_LENGTH
-    
-    try:
-        cpu_count = multiprocessing.cpu_count()
-    except NotImplementedError:
-        cpu_count = 4
+    if source is None:
+        source = MaskSource.brute_force(charset, password_length)
+    total_passwords = source.total
+    range_start, range_end = shard_range(shard[0], shard[1], total_passwords)
+    range_size = range_end - range_start
+    total_chunks = (range_size + chunk_size - 1) // chunk_size
+    if chunk_order is None:
+        chunk_order = list(range(total_chunks))
+
+    tasks = []
+    for chunk_id in chunk_order:
+        start_idx = range_start + chunk_id * chunk_size
+        end_idx = min(start_idx + chunk_size, range_end)
+        if checkpoint is None or not checkpoint.covers(start_idx, end_idx):
+            tasks.append((start_idx, end_idx))
+    pending_size = sum(end_idx - start_idx for start_idx, end_idx in tasks)
 
-    chunk_size = total_passwords // cpu_count
-    found_flag = multiprocessing.Value('b', False)
+    if process_count is None:
+        try:
+            process_count = multiprocessing.cpu_count()
+        except NotImplementedError:
+            process_count = 4
+
+    next_task = multiprocessing.Value('q', 0)
+    found_rank = multiprocessing.Value('q', NOT_FOUND)
     result_q = multiprocessing.Queue()
 
     print("--- 암호 해독 시작 ---")
     print(f"시작 시간: {time.strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"총 시도할 암호 수: {total_passwords:,}개")
-    print(f"워커 프로세스 수: {cpu_count}개")
+    print(f"후보 소스: {source.name}")
+    print(f"인덱스 공간 크기: {total_passwords:,}")
+    if shard[1] > 1:
+        print(f"샤드 {shard[0]}/{shard[1]}: 인덱스 {range_start:,} ~ {range_end:,} ({range_size:,}개)")
+    print(f"청크: {len(tasks):,}개 (청크당 {chunk_size:,}개)")
+    if checkpoint is not None and checkpoint.ranges:
+        print(f"체크포인트에서 이어서 실행: {checkpoint.completed_count():,}개 완료됨")
+    print(f"워커 프로세스 수: {process_count}개")
     print("---------------------\n")
 
     processes = []
-    for i in range(cpu_count):
-        start_index = i * chunk_size
-        end_index = (i + 1) * chunk_size if i < cpu_count - 1 else total_passwords
-        
-        process = multiprocessing.Process(target=worker, args=(start_index, end_index, found_flag, result_q, start_time))
+    for worker_id in range(process_count):
+        process = multiprocessing.Process(
+            target=worker,
+            args=(worker_id, zip_path, tasks, source, next_task, found_rank,
+                  result_q, start_time, deterministic)
+        )
         processes.append(process)
         process.start()
 
+    # 모든 워커의 'exit' 메시지를 받을 때까지 큐를 비우면서 진행 상황을 모읍니다.
+    # (살아 있는 프로세스를 폴링하면 마지막 워커가 끝난 뒤에도 최대 timeout만큼 더 기다리게 됩니다.)
+    worker_stats = {}
+    completed = 0
+    hits = []
+    interrupted = False
+    exited = set()
+    last_report = last_checkpoint = time.time()
+    while len(exited) < len(processes):
+        try:
+            message = result_q.get(timeout=0.5)
+        except queue.Empty:
+            message = None
+            if not any(process.is_alive() for process in processes):
+                # 'exit'를 보내지 못하고 비정상 종료한 워커가 있으면 더 기다리지 않습니다.
+                break
+        except KeyboardInterrupt:
+            # 워커를 모두 멈추고, 큐에 남은 완료 보고를 마저 받은 뒤 체크포인트를 저장합니다.
+            if not interrupted:
+                print("\n사용자 중단 요청. 워커를 정리하는 중입니다...")
+                interrupted = True
+                with found_rank.get_lock():
+                    found_rank.value = CANCELLED
+            continue
+
+        if message is not None:
+            kind, worker_id = message[0], message[1]
+            if kind == 'exit':
+                exited.add(worker_id)
+            elif kind == 'progress':
+                worker_stats[worker_id] = (message[2], message[3])
+            elif kind == 'found':
+                hits.append((message[2], message[3]))
+            elif kind == 'done':
+                completed += message[3] - message[2]
+                if checkpoint is not None:
+                    checkpoint.add(message[2], message[3])
+
+        if report_interval and time.time() - last_report >= report_interval:
+            _print_progress(worker_stats, completed, pending_size, time.time() - start_time)
+            last_report = time.time()
+
+        if checkpoint is not None and time.time() - last_checkpoint >= checkpoint_interval:
+            checkpoint.save()
+            last_checkpoint = time.time()
+
     for process in processes:
         process.join()
 
+    if stats is not None:
+        stats['workers'] = dict(worker_stats)
+        stats['attempts'] = sum(attempts for attempts, _ in worker_stats.values())
+
+    if checkpoint is not None:
+        try:
+            checkpoint.save()
+        except IOError as e:
+            print(f"오류: 체크포인트 저장에 실패했습니다 - {e}")
+
     end_time = time.time()
     total_elapsed_time = end_time - start_time
 
-    if not result_q.empty():
-        found_password = result_q.get()
+    if hits:
+        # 결정적 모드에서는 우선순위가 가장 높은 청크의 결과를 사용합니다.
+        found_password = min(hits)[1]
         print("\n--- 결과 ---")
         print(f"암호 해독 성공!")
         print(f"찾은 암호: {found_password}")
         print(f"총 소요 시간: {total_elapsed_time:.2f}초")
-        
-        try:
-            with open(PASSWORD_FILE, 'w', encoding='utf-8') as f:
-                f.write(found_password)
-            print(f"암호를 '{PASSWORD_FILE}' 파일에 성공적으로 저장했습니다.")
-        except IOError as e:
-            print(f"오류: 암호 파일 저장에 실패했습니다 - {e}")
+
+        if password_file is not None:
+            try:
+                with open(password_file, 'w', encoding='utf-8') as f:
+                    f.write(found_password)
+                print(f"암호를 '{password_file}' 파일에 성공적으로 저장했습니다.")
+            except IOError as e:
+                print(f"오류: 암호 파일 저장에 실패했습니다 - {e}")
+        return found_password
+
+    print("\n--- 결과 ---")
+    if interrupted:
+        print(f" 암호 해독 중단. (총 소요 시간: {total_elapsed_time:.2f}초)")
+        if checkpoint is not None:
+            print(f"진행 상황을 '{checkpoint.path}'에 저장했습니다. --resume으로 이어서 실행할 수 있습니다.")
     else:
-        print("\n--- 결과 ---")
         print(f" 암호 해독 실패. (총 소요 시간: {total_elapsed_time:.2f}초)")
+    return None
 
 
-if __name__ == '__main__':
-    if not os.path.exists(ZIP_PATH):
-        print(f"오류: '{ZIP_PATH}' 파일을 찾을 수 없습니다.")
+def parse_shard(value: str) -> tuple:
+    """'i/N' 형식의 샤드 지정 문자열을 (i, N)으로 변환합니다."""
+    try:
+        index_text, count_text = value.split('/')
+        shard = (int(index_text), int(count_text))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"샤드는 'i/N' 형식이어야 합니다: {value}")
+    if shard[1] < 1 or not 0 <= shard[0] < shard[1]:
+        raise argparse.ArgumentTypeError(f"샤드 번호는 0 이상 N 미만이어야 합니다: {value}")
+    return shard
+
+def build_source(args):
+    """명령행 인자로 후보 소스를 만듭니다. (마스크 > 단어 목록 > 전수 조사 순)"""
+    if args.mask:
+        return MaskSource.from_mask(args.mask)
+    if args.wordlist:
+        rules = list(args.rule)
+        if args.rules:
+            rules.extend(load_rules(args.rules))
+        return WordlistSource(args.wordlist, rules)
+    if args.rule or args.rules:
+        raise ValueError('--rule/--rules는 --wordlist와 함께 사용해야 합니다.')
+    return MaskSource.brute_force(args.charset, args.length)
+
+def main():
+    parser = argparse.ArgumentParser(description='emergency_storage_key.zip 암호 해독기')
+    parser.add_argument('--bench-gen', action='store_true', help='후보 암호 생성 속도 벤치마크만 실행합니다.')
+    parser.add_argument('--processes', type=int, default=None, help='워커 프로세스 수 (기본값: CPU 코어 수)')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='워커가 한 번에 가져가는 후보 수')
+    parser.add_argument('--deterministic', action='store_true',
+                        help='워커 수와 관계없이 탐색 순서상 가장 앞선 암호를 결과로 사용합니다.')
+    parser.add_argument('--checkpoint', default=CHECKPOINT_FILE, help='완료한 구간을 기록할 체크포인트 파일 경로')
+    progress = parser.add_mutually_exclusive_group()
+    progress.add_argument('--resume', action='store_true', help='체크포인트에 기록된 완료 구간을 건너뛰고 이어서 실행합니다.')
+    progress.add_argument('--fresh', action='store_true', help='기존 체크포인트를 버리고 처음부터 실행합니다.')
+    parser.add_argument('--shard', type=parse_shard, default=(0, 1),
+                        help="키 공간을 N개로 나눈 i번째 구간만 탐색합니다. (예: 0/4, 호스트마다 다른 i 사용)")
+    parser.add_argument('--charset', default=CHARSET, help='암호에 쓰이는 문자 집합')
+    parser.add_argument('--length', type=int, default=PASSWORD_LENGTH, help='암호 길이')
+    parser.add_argument('--zip', default=ZIP_PATH, help='해독할 ZIP 파일 경로')
+    attack = parser.add_mutually_exclusive_group()
+    attack.add_argument('--mask', help="hashcat 형식 마스크로 후보를 만듭니다. (예: '?d?d?l?l?l?l')")
+    attack.add_argument('--wordlist', help='단어 목록 파일의 각 줄을 후보로 사용합니다. (메모리 맵으로 흘려 읽음)')
+    parser.add_argument('--rule', action='append', default=[],
+                        help="단어 목록에 적용할 변형 규칙 (예: 'c$1', 여러 번 지정 가능)")
+    parser.add_argument('--rules', help='변형 규칙 파일 (한 줄에 규칙 하나)')
+    args = parser.parse_args()
+
+    if not args.charset or len(set(args.charset)) != len(args.charset) or not args.charset.isascii():
+        parser.error('문자 집합은 중복 없는 ASCII 문자여야 합니다.')
+    if args.length < 1:
+        parser.error('암호 길이는 1 이상이어야 합니다.')
+
+    if args.bench_gen:
+        benchmark_generation()
+        return
+
+    if not os.path.exists(args.zip):
+        print(f"오류: '{args.zip}' 파일을 찾을 수 없습니다.")
         print("스크립트와 동일한 폴더에 암호화된 zip 파일을 위치시켜 주세요.")
+        return
+
+    try:
+        source = build_source(args)
+    except (ValueError, OSError) as e:
+        print(f"오류: 후보 소스를 만들 수 없습니다 - {e}")
+        return
+
+    # 같은 폴더에서 여러 샤드를 띄워도 체크포인트가 서로 덮어쓰지 않도록 샤드별 파일을 씁니다.
+    checkpoint_path = args.checkpoint
+    if args.shard[1] > 1 and checkpoint_path == CHECKPOINT_FILE:
+        checkpoint_path = f"{os.path.splitext(CHECKPOINT_FILE)[0]}_shard{args.shard[0]}of{args.shard[1]}.json"
+
+    try:
+        target = zip_target(args.zip)
+    except (zipfile.BadZipFile, IndexError, OSError) as e:
+        print(f"오류: ZIP 파일을 읽을 수 없습니다 - {e}")
+        return
+
+    if args.resume:
+        try:
+            checkpoint = Checkpoint.load(checkpoint_path, source.name, target)
+        except (ValueError, json.JSONDecodeError) as e:
+            print(f"오류: 체크포인트를 읽을 수 없습니다 - {e}")
+            return
+    elif os.path.exists(checkpoint_path) and not args.fresh:
+        # 그냥 시작하면 빈 체크포인트가 주기적으로 저장되면서 이전 진행 상황을 덮어씁니다.
+        print(f"오류: 체크포인트 '{checkpoint_path}'가 이미 있습니다. "
+              "이어서 실행하려면 --resume, 처음부터 다시 하려면 --fresh를 지정하세요.")
+        return
     else:
-        unlock_zip()
+        checkpoint = Checkpoint(checkpoint_path, source.name, target)
+
+    unlock_zip(zip_path=args.zip, process_count=args.processes, chunk_size=args.chunk_size,
+               deterministic=args.deterministic, checkpoint=checkpoint, shard=args.shard, source=source)
+
+
+if __name__ == '__main__':
+    main()
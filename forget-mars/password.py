@@ -3,39 +3,57 @@
 
 import string
 import os
+import sys
+import abc
+import argparse
+import collections
+import itertools
+import multiprocessing
 
 # --- 상수 정의 ---
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PASSWORD_FILE = os.path.join(SCRIPT_DIR, 'password.txt')
 RESULT_FILE = os.path.join(SCRIPT_DIR, 'result.txt')
 
+LOWER_ALPHABET = string.ascii_lowercase
+UPPER_ALPHABET = string.ascii_uppercase
+ALPHABET_SIZE = len(LOWER_ALPHABET)
+
+# 영어 문장의 알파벳 출현 빈도 (%)
+ENGLISH_LETTER_FREQUENCY = {
+    'a': 8.167, 'b': 1.492, 'c': 2.782, 'd': 4.253, 'e': 12.702, 'f': 2.228, 'g': 2.015,
+    'h': 6.094, 'i': 6.966, 'j': 0.153, 'k': 0.772, 'l': 4.025, 'm': 2.406, 'n': 6.749,
+    'o': 7.507, 'p': 1.929, 'q': 0.095, 'r': 5.987, 's': 6.327, 't': 9.056, 'u': 2.758,
+    'v': 0.978, 'w': 2.360, 'x': 0.150, 'y': 1.974, 'z': 0.074,
+}
+
+
+def _build_shift_tables() -> list:
+    """
+    자리수(shift)별 변환 테이블을 한 번만 만들어 둡니다.
+    shift가 1일 때 'abc...' -> 'bcd...za' 처럼 소문자/대문자를 각각 밀어서 변환합니다.
+    """
+    tables = []
+    for shift in range(ALPHABET_SIZE):
+        shifted_lower = LOWER_ALPHABET[shift:] + LOWER_ALPHABET[:shift]
+        shifted_upper = UPPER_ALPHABET[shift:] + UPPER_ALPHABET[:shift]
+        tables.append(str.maketrans(LOWER_ALPHABET + UPPER_ALPHABET, shifted_lower + shifted_upper))
+    return tables
+
+
+SHIFT_TABLES = _build_shift_tables()
+
 def caesar_cipher_decode(target_text: str):
     """
     주어진 텍스트에 대해 카이사르 암호 해독을 수행하고,
     가능한 모든 경우의 수를 출력한 뒤 사용자의 선택을 받아 결과를 저장합니다.
     """
-    # 알파벳 소문자/대문자 준비
-    lower_alphabet = string.ascii_lowercase
-    upper_alphabet = string.ascii_uppercase
-
     decoded_results = []
 
     print("--- 카이사르 암호 해독 시작 ---\n")
     # 자리수는 알파벳 수만큼 반복 (0~25, 총 26번)
-    for shift in range(len(lower_alphabet)):
-        # 원본 알파벳과, shift만큼 밀린 새로운 알파벳 순서를 만듭니다.
-        # 예: shift가 1일 때, 'abc...' -> 'bcd...za'
-        shifted_lower = lower_alphabet[shift:] + lower_alphabet[:shift]
-        shifted_upper = upper_alphabet[shift:] + upper_alphabet[:shift]
-
-        # 변환 규칙(테이블) 생성
-        # 소문자는 소문자 규칙으로, 대문자는 대문자 규칙으로 변환합니다.
-        translation_table = str.maketrans(
-            lower_alphabet + upper_alphabet,
-            shifted_lower + shifted_upper
-        )
-
-        # 변환 규칙을 적용하여 텍스트 해독
+    for shift, translation_table in enumerate(SHIFT_TABLES):
+        # 미리 만들어 둔 변환 테이블을 적용하여 텍스트 해독
         decoded_text = target_text.translate(translation_table)
         decoded_results.append(decoded_text)
 
@@ -72,6 +90,387 @@ def caesar_cipher_decode(target_text: str):
         except Exception as e:
             print(f"예상치 못한 오류가 발생했습니다: {e}")
 
+def letter_counts(text: str) -> list:
+    """텍스트의 알파벳 a~z 출현 횟수를 대소문자 구분 없이 셉니다."""
+    lowered = text.lower()
+    return [lowered.count(ch) for ch in LOWER_ALPHABET]
+
+
+def chi_squared_scores(text: str) -> list:
+    """
+    26가지 shift 각각으로 해독했을 때의 영어 빈도 카이제곱 값을 반환합니다. (작을수록 영어에 가까움)
+    해독은 글자를 shift만큼 미는 것뿐이므로, 암호문의 글자 수를 한 번만 세고 shift마다 회전시켜 계산합니다.
+    """
+    counts = letter_counts(text)
+    total = sum(counts)
+    if total == 0:
+        return [0.0] * ALPHABET_SIZE
+
+    expected = [ENGLISH_LETTER_FREQUENCY[ch] / 100 * total for ch in LOWER_ALPHABET]
+    scores = []
+    for shift in range(ALPHABET_SIZE):
+        score = 0.0
+        for plain_index, expected_count in enumerate(expected):
+            observed = counts[(plain_index - shift) % ALPHABET_SIZE]
+            score += (observed - expected_count) ** 2 / expected_count
+        scores.append(score)
+    return scores
+
+
+def dictionary_hit_rate(text: str, dictionary: set) -> float:
+    """텍스트의 단어 중 사전에 있는 단어의 비율을 반환합니다."""
+    words = [word.strip(string.punctuation) for word in text.lower().split()]
+    words = [word for word in words if word]
+    if not words:
+        return 0.0
+    return sum(1 for word in words if word in dictionary) / len(words)
+
+
+def load_dictionary(path: str) -> set:
+    """한 줄에 한 단어씩 적힌 사전 파일을 소문자 집합으로 읽습니다."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return {line.strip().lower() for line in f if line.strip()}
+
+
+def best_shift(target_text: str, dictionary: set = None) -> tuple:
+    """
+    사람의 선택 없이 가장 그럴듯한 해독 결과를 고릅니다.
+    사전이 주어지면 사전 단어 비율이 가장 높은 shift를, 같으면 카이제곱 값이 작은 shift를 고릅니다.
+    (shift, 해독된 텍스트)를 반환합니다.
+    """
+    scores = chi_squared_scores(target_text)
+    if dictionary:
+        hit_rates = [dictionary_hit_rate(target_text.translate(table), dictionary) for table in SHIFT_TABLES]
+        shift = min(range(ALPHABET_SIZE), key=lambda s: (-hit_rates[s], scores[s]))
+    else:
+        shift = min(range(ALPHABET_SIZE), key=scores.__getitem__)
+    return shift, target_text.translate(SHIFT_TABLES[shift])
+
+
+# --- 고전 암호 해독 엔진 ---
+
+DecodeResult = collections.namedtuple('DecodeResult', 'cipher key plaintext score')
+
+# 영어 문장의 일치 지수(Index of Coincidence). 무작위 문자열은 약 0.038
+ENGLISH_IOC = 0.066
+VIGENERE_MAX_KEY_LENGTH = 20
+# 비즈네르 열(column) 하나에 필요한 최소 글자 수
+VIGENERE_MIN_COLUMN_LETTERS = 5
+# 스트리밍 입력을 읽는 블록 크기
+READ_BLOCK_SIZE = 1 << 20
+# 프로세스 풀 모드에서 프로세스마다 동시에 맡겨 두는 레코드 묶음 수 (입력을 미리 읽는 양의 상한)
+PENDING_BATCHES_PER_PROCESS = 2
+
+
+def _chi_squared_per_letter(text: str) -> float:
+    """
+    해독 결과끼리(암호 종류가 달라도) 비교할 수 있도록 글자 수로 나눈 카이제곱 값.
+    후보마다 불리므로 26가지 shift를 모두 계산하는 chi_squared_scores 대신 회전하지 않은 값 하나만 계산합니다.
+    """
+    counts = letter_counts(text)
+    letters = sum(counts)
+    if letters == 0:
+        return float('inf')
+    score = 0.0
+    for observed, ch in zip(counts, LOWER_ALPHABET):
+        expected_count = ENGLISH_LETTER_FREQUENCY[ch] / 100 * letters
+        score += (observed - expected_count) ** 2 / expected_count
+    return score / letters
+
+
+class Decoder(abc.ABC):
+    """
+    모든 해독기의 공통 인터페이스.
+    candidates()는 가능한 (키, 해독문)을 모두 내고, crack()은 그중 가장 그럴듯한 결과 하나를 DecodeResult로 반환합니다.
+    """
+    name = ''
+
+    @abc.abstractmethod
+    def candidates(self, text: str):
+        """가능한 (키, 해독문)을 하나씩 내보냅니다."""
+
+    def crack(self, text: str, dictionary: set = None) -> DecodeResult:
+        best = None
+        for key, plaintext in self.candidates(text):
+            result = DecodeResult(self.name, key, plaintext, score_plaintext(plaintext, dictionary))
+            if best is None or result.score < best.score:
+                best = result
+        return best
+
+
+class CaesarDecoder(Decoder):
+    """26가지 자리수를 모두 시도하는 카이사르 해독기. (미리 만든 SHIFT_TABLES 사용)"""
+    name = 'caesar'
+
+    def candidates(self, text: str):
+        for shift, table in enumerate(SHIFT_TABLES):
+            yield shift, text.translate(table)
+
+    def crack(self, text: str, dictionary: set = None) -> DecodeResult:
+        # 26개를 모두 해독하지 않고 글자 빈도 회전으로 최적 shift를 바로 고릅니다.
+        shift, plaintext = best_shift(text, dictionary)
+        return DecodeResult(self.name, shift, plaintext, score_plaintext(plaintext, dictionary))
+
+
+class TableDecoder(Decoder):
+    """키가 없는 고정 치환 암호(ROT13, ROT47, Atbash 등)를 str.maketrans 테이블 하나로 해독합니다."""
+
+    def __init__(self, name: str, source: str, target: str):
+        self.name = name
+        self.table = str.maketrans(source, target)
+
+    def candidates(self, text: str):
+        yield None, text.translate(self.table)
+
+
+def _rotate(alphabet: str, amount: int) -> str:
+    return alphabet[amount:] + alphabet[:amount]
+
+
+_PRINTABLE_ASCII = ''.join(chr(code) for code in range(33, 127))
+
+
+def make_rot13_decoder() -> TableDecoder:
+    return TableDecoder('rot13', LOWER_ALPHABET + UPPER_ALPHABET,
+                        _rotate(LOWER_ALPHABET, 13) + _rotate(UPPER_ALPHABET, 13))
+
+
+def make_rot47_decoder() -> TableDecoder:
+    return TableDecoder('rot47', _PRINTABLE_ASCII, _rotate(_PRINTABLE_ASCII, 47))
+
+
+def make_atbash_decoder() -> TableDecoder:
+    return TableDecoder('atbash', LOWER_ALPHABET + UPPER_ALPHABET,
+                        LOWER_ALPHABET[::-1] + UPPER_ALPHABET[::-1])
+
+
+def index_of_coincidence(text: str) -> float:
+    """텍스트의 일치 지수. 같은 글자 두 개를 뽑을 확률입니다."""
+    counts = letter_counts(text)
+    total = sum(counts)
+    if total < 2:
+        return 0.0
+    return sum(count * (count - 1) for count in counts) / (total * (total - 1))
+
+
+def kasiski_key_lengths(letters: str, max_length: int = VIGENERE_MAX_KEY_LENGTH, ngram: int = 3) -> collections.Counter:
+    """
+    카시스키 검사: 반복되는 n-gram 사이 거리의 약수를 세어 키 길이 후보별 득표 수를 반환합니다.
+    letters는 알파벳만 남긴 소문자 문자열입니다.
+    """
+    last_seen = {}
+    votes = collections.Counter()
+    for pos in range(len(letters) - ngram + 1):
+        gram = letters[pos:pos + ngram]
+        if gram in last_seen:
+            distance = pos - last_seen[gram]
+            for length in range(2, max_length + 1):
+                if distance % length == 0:
+                    votes[length] += 1
+        last_seen[gram] = pos
+    return votes
+
+
+class VigenereDecoder(Decoder):
+    """
+    비즈네르 해독기.
+    일치 지수(IoC)로 키 길이를 고르고(카시스키 득표로 동점 처리), 열마다 카이사르 카이제곱으로 키 글자를 찾습니다.
+    """
+    name = 'vigenere'
+
+    def __init__(self, max_key_length: int = VIGENERE_MAX_KEY_LENGTH):
+        self.max_key_length = max_key_length
+
+    def guess_key_length(self, letters: str) -> int:
+        max_length = min(self.max_key_length, len(letters) // VIGENERE_MIN_COLUMN_LETTERS)
+        if max_length < 2:
+            return 1
+
+        votes = kasiski_key_lengths(letters, max_length)
+        ioc_by_length = {}
+        for length in range(1, max_length + 1):
+            columns = [letters[i::length] for i in range(length)]
+            ioc_by_length[length] = sum(index_of_coincidence(column) for column in columns) / length
+
+        # 영어에 가까운 IoC가 나오는 가장 짧은 길이를 고릅니다. (배수 길이도 IoC가 높게 나오므로)
+        threshold = (ENGLISH_IOC + 0.038) / 2 + 0.01
+        for length in range(1, max_length + 1):
+            if ioc_by_length[length] >= threshold:
+                return length
+        return max(ioc_by_length, key=lambda length: (ioc_by_length[length], votes[length]))
+
+    def decrypt(self, text: str, shifts: list) -> str:
+        """알파벳에만 키를 적용하고, 나머지 문자는 그대로 둔 채 키 위치도 넘기지 않습니다."""
+        chars = list(text)
+        letter_index = 0
+        period = len(shifts)
+        for pos, ch in enumerate(chars):
+            if ch in _ASCII_LETTERS:
+                chars[pos] = ch.translate(SHIFT_TABLES[shifts[letter_index % period]])
+                letter_index += 1
+        return ''.join(chars)
+
+    def _solve(self, text: str) -> tuple:
+        letters = ''.join(ch for ch in text.lower() if ch in _LOWER_SET)
+        key_length = self.guess_key_length(letters)
+        shifts = []
+        for i in range(key_length):
+            scores = chi_squared_scores(letters[i::key_length])
+            shifts.append(min(range(ALPHABET_SIZE), key=scores.__getitem__))
+        # 해독 shift s는 암호화 키 글자 (26 - s)에 해당합니다.
+        key = ''.join(LOWER_ALPHABET[(ALPHABET_SIZE - shift) % ALPHABET_SIZE] for shift in shifts)
+        return key, shifts
+
+    def candidates(self, text: str):
+        key, shifts = self._solve(text)
+        yield key, self.decrypt(text, shifts)
+
+
+_ASCII_LETTERS = frozenset(LOWER_ALPHABET + UPPER_ALPHABET)
+_LOWER_SET = frozenset(LOWER_ALPHABET)
+
+DECODER_FACTORIES = {
+    'caesar': CaesarDecoder,
+    'rot13': make_rot13_decoder,
+    'rot47': make_rot47_decoder,
+    'atbash': make_atbash_decoder,
+    'vigenere': VigenereDecoder,
+}
+
+
+def make_decoders(names) -> list:
+    """암호 이름 목록으로 해독기 목록을 만듭니다. 'all'은 모든 해독기를 뜻합니다."""
+    if 'all' in names:
+        names = list(DECODER_FACTORIES)
+    unknown = [name for name in names if name not in DECODER_FACTORIES]
+    if unknown:
+        raise ValueError(f"지원하지 않는 암호입니다: {', '.join(unknown)}")
+    return [DECODER_FACTORIES[name]() for name in names]
+
+
+def score_plaintext(plaintext: str, dictionary: set = None) -> float:
+    """해독 결과의 점수 (작을수록 좋음). 사전이 있으면 사전 단어 비율을 우선합니다."""
+    score = _chi_squared_per_letter(plaintext)
+    if dictionary:
+        score -= dictionary_hit_rate(plaintext, dictionary) * 1000
+    return score
+
+
+def crack(text: str, decoders: list, dictionary: set = None) -> DecodeResult:
+    """여러 해독기의 결과 중 가장 점수가 좋은 것을 고릅니다."""
+    best = None
+    for decoder in decoders:
+        result = decoder.crack(text, dictionary)
+        if best is None or result.score < best.score:
+            best = result
+    return best
+
+
+def iter_records(paths, block_size: int = READ_BLOCK_SIZE):
+    """
+    파일 목록을 block_size 단위로 읽어 줄(레코드) 단위로 내보냅니다. '-'는 표준 입력을 뜻합니다.
+    전체를 메모리에 올리지 않으므로 수 GB 입력도 일정한 메모리로 처리합니다.
+    """
+    for path in paths:
+        f = sys.stdin if path == '-' else open(path, 'r', encoding='utf-8', newline='')
+        try:
+            pending = ''
+            while True:
+                block = f.read(block_size)
+                if not block:
+                    break
+                lines = (pending + block).split('\n')
+                pending = lines.pop()
+                for line in lines:
+                    yield line.rstrip('\r')
+            if pending:
+                yield pending.rstrip('\r')
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+
+_worker_state = {}
+
+
+def _init_crack_worker(cipher_names, dictionary):
+    _worker_state['decoders'] = make_decoders(cipher_names)
+    _worker_state['dictionary'] = dictionary
+
+
+def _crack_in_worker(text: str) -> DecodeResult:
+    if not text:
+        return DecodeResult('', None, text, 0.0)
+    return crack(text, _worker_state['decoders'], _worker_state['dictionary'])
+
+
+def _crack_batch(texts: list) -> list:
+    return [_crack_in_worker(text) for text in texts]
+
+
+def crack_stream(records, cipher_names=('caesar',), dictionary: set = None, processes: int = 1,
+                 chunksize: int = 64):
+    """
+    레코드(암호문)마다 가장 그럴듯한 해독 결과를 입력 순서대로 내보냅니다.
+    processes가 2 이상이면 프로세스 풀에서 여러 암호문을 동시에 공격합니다.
+    Pool.imap은 입력을 제한 없이 미리 읽어 작업을 쌓아 두므로, chunksize개씩 묶어 맡기고
+    처리 중인 묶음이 processes x PENDING_BATCHES_PER_PROCESS개가 되면 가장 앞 묶음의 결과를 받은 뒤에 더 읽습니다.
+    """
+    if processes <= 1:
+        _init_crack_worker(cipher_names, dictionary)
+        for text in records:
+            yield _crack_in_worker(text)
+        return
+
+    with multiprocessing.Pool(processes, initializer=_init_crack_worker,
+                              initargs=(cipher_names, dictionary)) as pool:
+        records = iter(records)
+        pending = collections.deque()
+        for batch in iter(lambda: list(itertools.islice(records, chunksize)), []):
+            pending.append(pool.apply_async(_crack_batch, (batch,)))
+            if len(pending) >= processes * PENDING_BATCHES_PER_PROCESS:
+                yield from pending.popleft().get()
+        while pending:
+            yield from pending.popleft().get()
+
+
+def run_batch(paths, output_path: str = RESULT_FILE, dictionary_path: str = None,
+              cipher_names=('caesar',), processes: int = 1):
+    """
+    여러 파일의 암호문을 사용자 입력 없이 해독해서 output_path('-'면 표준 출력)에 줄 단위로 씁니다.
+    cipher_names의 해독기를 모두 시도해서 줄마다 가장 그럴듯한 결과를 고릅니다.
+    """
+    try:
+        make_decoders(cipher_names)
+        dictionary = load_dictionary(dictionary_path) if dictionary_path else None
+    except ValueError as e:
+        print(f"오류: {e}")
+        return
+    except OSError as e:
+        print(f"오류: 사전 파일을 읽을 수 없습니다 - {e}")
+        return
+
+    try:
+        out = sys.stdout if output_path == '-' else open(output_path, 'w', encoding='utf-8')
+    except OSError as e:
+        print(f"오류: 결과 파일을 열 수 없습니다 - {e}")
+        return
+
+    count = 0
+    try:
+        for result in crack_stream(iter_records(paths), cipher_names, dictionary, processes):
+            out.write(result.plaintext + '\n')
+            count += 1
+    except OSError as e:
+        print(f"오류: 입력 파일을 처리하는 중 문제가 발생했습니다 - {e}")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    if out is not sys.stdout:
+        print(f"{count}줄을 해독해서 '{output_path}' 파일에 저장했습니다.")
+
+
 def main():
     """메인 실행 함수"""
     try:
@@ -94,4 +493,18 @@ def main():
 
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description='카이사르 암호 해독기')
+    parser.add_argument('--batch', nargs='+', metavar='FILE',
+                        help="사용자 입력 없이 파일(들)의 각 줄을 자동 해독합니다. ('-'는 표준 입력)")
+    parser.add_argument('--output', default=RESULT_FILE, help="배치 모드 결과 파일 ('-'는 표준 출력)")
+    parser.add_argument('--dictionary', help='배치 모드에서 사용할 사전 파일 (한 줄에 한 단어)')
+    parser.add_argument('--cipher', default='caesar',
+                        help=f"배치 모드에서 시도할 암호 (쉼표로 구분, {', '.join(DECODER_FACTORIES)}, all)")
+    parser.add_argument('--processes', type=int, default=1, help='배치 모드에서 동시에 해독할 프로세스 수')
+    args = parser.parse_args()
+
+    if args.batch:
+        run_batch(args.batch, args.output, args.dictionary,
+                  [name.strip() for name in args.cipher.split(',') if name.strip()], args.processes)
+    else:
+        main()